@@ -4,14 +4,42 @@ Fetches earnings dates using Finnhub API with Yahoo Finance fallback, and filter
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime, timedelta
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Tuple
+import asyncio
+import atexit
+import functools
 import json
 import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError, as_completed
 from pathlib import Path
 from typing import Any
 
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Below this many opportunities the plain loop beats building NumPy arrays.
+FILTER_VECTORIZE_MIN = 256
+
 # NOTE: We intentionally DO NOT freeze FINNHUB_API_KEY at import time.
 # Some entrypoints load env vars (e.g. from .env/.secrets.env) after imports.
 # Always read from os.environ when needed.
@@ -21,9 +49,109 @@ def _finnhub_key() -> Optional[str]:
     key = (os.environ.get('FINNHUB_API_KEY') or '').strip()
     return key or None
 
+
+def _retry_delay(retry_after: Optional[str], attempt: int) -> float:
+    """Seconds to wait after a 429: the server's Retry-After if given, else 1s, 2s, 4s..."""
+    try:
+        return max(0.0, float(retry_after))
+    except (TypeError, ValueError):
+        return float(2 ** attempt)
+
 # Cache controls
 EARNINGS_CACHE_TTL_SECONDS = int(os.environ.get('EARNINGS_CACHE_TTL_SECONDS', '86400'))  # 1 day
 CONFIRM_WITH_YFINANCE = (os.environ.get('EARNINGS_CONFIRM_YFINANCE', '1').strip() != '0')
+# Minimum seconds between cache file rewrites during single-ticker lookups (flushed at exit).
+EARNINGS_CACHE_MIN_SAVE_INTERVAL = float(os.environ.get('EARNINGS_CACHE_MIN_SAVE_INTERVAL', '5'))
+# A present FINNHUB_API_KEY is re-read from the environment at most this often.
+FINNHUB_KEY_REFRESH_SECONDS = 30.0
+
+# Batch fetch controls (Finnhub free tier allows 60 calls/minute)
+FINNHUB_MAX_CONCURRENCY = int(os.environ.get('FINNHUB_MAX_CONCURRENCY', '8'))
+# With 1s, 2s, 4s... backoff, 6 attempts wait out a full one-minute quota window.
+FINNHUB_MAX_RETRIES = int(os.environ.get('FINNHUB_MAX_RETRIES', '6'))
+# yfinance has no async API; batch lookups run it on a thread pool instead.
+EARNINGS_YF_WORKERS = max(1, int(os.environ.get('EARNINGS_YF_WORKERS', '8')))
+EARNINGS_YF_TIMEOUT_SECONDS = 10.0
+# Yahoo answers are reused for this long (also across runs, via the .yahoo.json sidecar).
+EARNINGS_YAHOO_TTL_SECONDS = int(os.environ.get('EARNINGS_YAHOO_TTL_SECONDS', str(6 * 3600)))
+
+# Sentinel: Yahoo has not been queried yet for this ticker.
+_NOT_FETCHED = object()
+
+# Shared source table for the columnar (v3) cache layout; rows store an index into it.
+_CACHE_SOURCES = ['none', 'finnhub', 'yahoo', 'unknown']
+
+
+@functools.lru_cache(maxsize=2)
+def _midnight_for_day(epoch_day: int) -> datetime:
+    return datetime(1970, 1, 1) + timedelta(days=epoch_day)
+
+
+@functools.lru_cache(maxsize=2)
+def _iso_for_day(epoch_day: int) -> str:
+    return _midnight_for_day(epoch_day).strftime('%Y-%m-%d')
+
+
+def _local_epoch_day() -> int:
+    now = time.time()
+    return int((now + time.localtime(now).tm_gmtoff) // 86400)
+
+
+def _today_midnight() -> datetime:
+    """Local midnight today; one shared object per day instead of a datetime.now() per call."""
+    return _midnight_for_day(_local_epoch_day())
+
+
+def _today_iso() -> str:
+    """Today's local date as 'YYYY-MM-DD'."""
+    return _iso_for_day(_local_epoch_day())
+
+
+def _parse_ymd(date_str: str) -> datetime:
+    """Parse 'YYYY-MM-DD' by slicing (strptime's format engine is several times slower)."""
+    return datetime(int(date_str[:4]), int(date_str[5:7]), int(date_str[8:10]))
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse_expiry(expiry: str) -> datetime:
+    """Parse a YYYYMMDD option expiry (memoized; scans reuse a handful of expiries)."""
+    return datetime(int(expiry[:4]), int(expiry[4:6]), int(expiry[6:8]))
+
+
+@functools.lru_cache(maxsize=1024)
+def _expiry_ordinal(expiry: str) -> int:
+    """Proleptic ordinal of a YYYYMMDD expiry (memoized)."""
+    return _parse_expiry(expiry).toordinal()
+
+
+def _iso_date_or_none(value: Any) -> Optional[str]:
+    """Return value if it looks like a YYYY-MM-DD string, else None."""
+    if isinstance(value, str) and len(value) == 10 and value[4] == '-' and value[7] == '-':
+        return value
+    return None
+
+
+def _write_json_atomic(path: str, payload: Any) -> None:
+    """Compact JSON write via temp file + os.replace, so a crash never leaves a torn file."""
+    try:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+    except Exception:
+        pass
+    tmp = f"{path}.tmp"
+    if ORJSON_AVAILABLE:
+        with open(tmp, 'wb') as f:
+            f.write(orjson.dumps(payload))
+    else:
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, separators=(',', ':'))
+    os.replace(tmp, path)
+
+
+def _read_json(path: str) -> Any:
+    if ORJSON_AVAILABLE:
+        return orjson.loads(Path(path).read_bytes())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
 
 
 def _default_cache_path() -> str:
@@ -40,34 +168,91 @@ class EarningsChecker:
     """Check for upcoming earnings dates using Finnhub API with Yahoo Finance fallback."""
     
     def __init__(self, cache_file: Optional[str] = None, use_yahoo_fallback: bool = True):
-        self.cache: Dict[str, Optional[datetime]] = {}
+        # Dates are kept as their on-disk 'YYYY-MM-DD' strings; datetimes are built lazily (see _as_dt).
+        self.cache: Dict[str, Optional[str]] = {}
+        self._cache_dt: Dict[str, datetime] = {}
         self._checked_at: Dict[str, float] = {}
         self._api_key_present: Dict[str, bool] = {}
         self._source: Dict[str, str] = {}
         self.cache_file = (cache_file or os.environ.get('EARNINGS_CACHE_FILE') or _default_cache_path())
         self.api_key = _finnhub_key()
+        self._api_key_read_at = time.monotonic()
         self.use_yahoo_fallback = use_yahoo_fallback
+        # Keep-alive session: one TCP/TLS handshake amortized across all Finnhub calls.
+        self._http = requests.Session()
+        self._http.mount('https://', HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=32,
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504]),
+        ))
+        # Guards cache dicts + file writes when lookups run on worker threads.
+        self._lock = threading.Lock()
+        # Full Finnhub calendar for a window (see _prefetch_calendar): symbol -> upcoming dates
+        self._calendar_index: Optional[Dict[str, List[datetime]]] = None
+        self._calendar_days_ahead = 0
+        self._calendar_day = None
+        self._dirty = False
+        self._last_save_ts = 0.0
+        # Yahoo lookups: ticker -> (fetched_at epoch, 'YYYY-MM-DD' or None), persisted beside the main cache.
+        self._yahoo_cache: Dict[str, Tuple[float, Optional[str]]] = {}
+        self._yahoo_cache_file = str(Path(self.cache_file).with_suffix('.yahoo.json'))
+        self._yahoo_dirty = False
         self._load_cache()
+        self._load_yahoo_cache()
+        atexit.register(self._flush_cache)
+
+    def __enter__(self) -> 'EarningsChecker':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Flush pending cache changes and release pooled HTTP connections."""
+        self._flush_cache()
+        self._http.close()
     
+    def _refresh_api_key(self) -> None:
+        """Re-read FINNHUB_API_KEY, throttled once a key is known (a missing key is always re-checked)."""
+        now = time.monotonic()
+        if self.api_key and (now - self._api_key_read_at) < FINNHUB_KEY_REFRESH_SECONDS:
+            return
+        self.api_key = _finnhub_key()
+        self._api_key_read_at = now
+
     def _load_cache(self):
         """Load cached earnings dates from file."""
         if os.path.exists(self.cache_file):
             try:
-                with open(self.cache_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+                data = _read_json(self.cache_file)
 
                 # Back-compat: {"AAPL": "2025-01-01"}
                 if isinstance(data, dict) and all(isinstance(v, (str, type(None))) for v in data.values()):
                     for ticker, date_str in data.items():
-                        if date_str:
-                            self.cache[ticker] = datetime.strptime(date_str, '%Y-%m-%d')
-                            self._checked_at[ticker] = 0.0
-                        else:
-                            self.cache[ticker] = None
-                            self._checked_at[ticker] = 0.0
+                        self.cache[ticker] = _iso_date_or_none(date_str)
+                        self._checked_at[ticker] = 0.0
                     return
 
-                # Current format: {"tickers": {"AAPL": {"date": "YYYY-MM-DD"|null, "checked_at": <epoch>}}, "meta": {...}}
+                # Current format (v3): {"meta": {"version": 3, "sources": [...]},
+                #                       "rows": {"AAPL": ["YYYY-MM-DD"|null, <epoch>, 0|1, <source idx>]}}
+                rows = data.get('rows') if isinstance(data, dict) else None
+                if isinstance(rows, dict):
+                    meta = data.get('meta') if isinstance(data.get('meta'), dict) else {}
+                    sources = meta.get('sources')
+                    if not isinstance(sources, list):
+                        sources = _CACHE_SOURCES
+                    for ticker, row in rows.items():
+                        if not isinstance(row, list) or len(row) < 4:
+                            continue
+                        date_str, checked_at, key_flag, src_idx = row[0], row[1], row[2], row[3]
+                        self.cache[ticker] = _iso_date_or_none(date_str)
+                        self._checked_at[ticker] = float(checked_at) if isinstance(checked_at, (int, float)) else 0.0
+                        self._api_key_present[ticker] = bool(key_flag)
+                        if isinstance(src_idx, int) and 0 <= src_idx < len(sources):
+                            self._source[ticker] = str(sources[src_idx])
+                    return
+
+                # v2: {"tickers": {"AAPL": {"date": "YYYY-MM-DD"|null, "checked_at": <epoch>}}, "meta": {...}}
                 tickers_obj = data.get('tickers') if isinstance(data, dict) else None
                 if isinstance(tickers_obj, dict):
                     for ticker, entry in tickers_obj.items():
@@ -85,41 +270,97 @@ class EarningsChecker:
                             self._api_key_present[ticker] = api_key_present
                         if isinstance(source, str):
                             self._source[ticker] = source
-                        if date_str:
-                            try:
-                                self.cache[ticker] = datetime.strptime(date_str, '%Y-%m-%d')
-                            except Exception:
-                                self.cache[ticker] = None
-                        else:
-                            self.cache[ticker] = None
+                        self.cache[ticker] = _iso_date_or_none(date_str)
             except Exception as e:
                 print(f"Warning: Could not load earnings cache: {e}")
     
     def _save_cache(self):
         """Save cached earnings dates to file."""
+        with self._lock:
+            self._save_cache_locked()
+
+    def _maybe_save_cache(self):
+        """Save the cache if it changed and the last save is older than the debounce interval."""
+        if self._dirty and (time.time() - self._last_save_ts) > EARNINGS_CACHE_MIN_SAVE_INTERVAL:
+            self._save_cache()
+
+    def _flush_cache(self):
+        """Write any pending cache changes (registered with atexit)."""
+        if self._dirty:
+            self._save_cache()
+
+    def _save_cache_locked(self):
         try:
-            tickers_obj: Dict[str, Dict[str, object]] = {}
-            for ticker, dt in self.cache.items():
-                tickers_obj[ticker] = {
-                    'date': dt.strftime('%Y-%m-%d') if dt else None,
-                    'checked_at': float(self._checked_at.get(ticker, 0.0)),
-                    'api_key_present': bool(self._api_key_present.get(ticker, False)),
-                    'source': self._source.get(ticker, 'unknown'),
-                }
+            sources = list(_CACHE_SOURCES)
+            source_idx = {name: i for i, name in enumerate(sources)}
+            rows: Dict[str, List[object]] = {}
+            for ticker, date_str in self.cache.items():
+                source = self._source.get(ticker, 'unknown')
+                idx = source_idx.get(source)
+                if idx is None:
+                    idx = source_idx[source] = len(sources)
+                    sources.append(source)
+                rows[ticker] = [
+                    date_str,
+                    int(self._checked_at.get(ticker, 0.0)),
+                    1 if self._api_key_present.get(ticker, False) else 0,
+                    idx,
+                ]
             payload = {
-                'meta': {'version': 2},
-                'tickers': tickers_obj,
+                'meta': {'version': 3, 'sources': sources},
+                'rows': rows,
             }
-            # Ensure parent exists
-            try:
-                Path(self.cache_file).parent.mkdir(parents=True, exist_ok=True)
-            except Exception:
-                pass
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(payload, f, indent=2)
+            _write_json_atomic(self.cache_file, payload)
+            self._dirty = False
+            self._last_save_ts = time.time()
         except Exception as e:
             print(f"Warning: Could not save earnings cache: {e}")
 
+        if self._yahoo_dirty:
+            try:
+                rows = {ticker: [int(fetched_at), date_str] for ticker, (fetched_at, date_str) in self._yahoo_cache.items()}
+                _write_json_atomic(self._yahoo_cache_file, {'meta': {'version': 1}, 'rows': rows})
+                self._yahoo_dirty = False
+            except Exception as e:
+                print(f"Warning: Could not save Yahoo earnings cache: {e}")
+
+    def _load_yahoo_cache(self):
+        """Load the Yahoo sidecar cache, dropping entries past EARNINGS_YAHOO_TTL_SECONDS."""
+        if not os.path.exists(self._yahoo_cache_file):
+            return
+        try:
+            data = _read_json(self._yahoo_cache_file)
+            rows = data.get('rows') if isinstance(data, dict) else None
+            if not isinstance(rows, dict):
+                return
+            cutoff = time.time() - EARNINGS_YAHOO_TTL_SECONDS
+            for ticker, row in rows.items():
+                if not isinstance(row, list) or len(row) < 2 or not isinstance(row[0], (int, float)):
+                    continue
+                if row[0] >= cutoff:
+                    self._yahoo_cache[ticker] = (float(row[0]), _iso_date_or_none(row[1]))
+        except Exception as e:
+            print(f"Warning: Could not load Yahoo earnings cache: {e}")
+
+    def _as_dt(self, ticker: str) -> Optional[datetime]:
+        """Cached earnings date for ticker as a datetime (parsed once, then memoized)."""
+        dt = self._cache_dt.get(ticker)
+        if dt is not None:
+            return dt
+        date_str = self.cache.get(ticker)
+        if not date_str:
+            return None
+        try:
+            dt = _parse_ymd(date_str)
+        except ValueError:
+            return None
+        self._cache_dt[ticker] = dt
+        return dt
+
+    def get_cached_date(self, ticker: str) -> Optional[datetime]:
+        """Cached earnings date for ticker without any freshness check or API call."""
+        return self._as_dt(ticker)
+
     def _cache_fresh(self, ticker: str) -> bool:
         checked_at = float(self._checked_at.get(ticker, 0.0) or 0.0)
         if checked_at <= 0:
@@ -128,7 +369,7 @@ class EarningsChecker:
     
     def _get_earnings_from_yahoo(self, ticker: str) -> Optional[datetime]:
         """
-        Get earnings date from Yahoo Finance using yfinance library.
+        Get earnings date from Yahoo Finance, reusing answers younger than EARNINGS_YAHOO_TTL_SECONDS.
         
         Args:
             ticker: Stock symbol
@@ -136,74 +377,131 @@ class EarningsChecker:
         Returns:
             datetime of next earnings or None
         """
+        entry = self._yahoo_cache.get(ticker)
+        if entry is not None and (time.time() - entry[0]) <= EARNINGS_YAHOO_TTL_SECONDS:
+            date_str = entry[1]
+            if date_str is None:
+                return None
+            if date_str >= _today_iso():
+                return _parse_ymd(date_str)
+
         try:
-            import yfinance as yf
-            
-            stock = yf.Ticker(ticker)
-            calendar = stock.calendar
-            
-            if calendar and 'Earnings Date' in calendar:
-                earnings_dates = calendar['Earnings Date']
-                if earnings_dates and len(earnings_dates) > 0:
-                    # yfinance returns date objects
-                    earnings_date = earnings_dates[0]
-                    
-                    # Convert to datetime if needed
-                    if hasattr(earnings_date, 'year'):
-                        dt = datetime(earnings_date.year, earnings_date.month, earnings_date.day)
-                    else:
-                        dt = datetime.strptime(str(earnings_date), '%Y-%m-%d')
-                    
-                    # Only return if it's today or in the future
-                    if dt >= datetime.now().replace(hour=0, minute=0, second=0, microsecond=0):
-                        return dt
-            
-            return None
-            
+            earnings_date = self._fetch_earnings_from_yahoo(ticker)
         except Exception as e:
             print(f"    Warning: Could not fetch earnings from Yahoo for {ticker}: {e}")
             return None
+
+        with self._lock:
+            self._yahoo_cache[ticker] = (time.time(), earnings_date.strftime('%Y-%m-%d') if earnings_date else None)
+            self._yahoo_dirty = True
+            self._dirty = True
+        return earnings_date
+
+    def _fetch_earnings_from_yahoo(self, ticker: str) -> Optional[datetime]:
+        """Query yfinance for the next earnings date (network; raises on failure)."""
+        import yfinance as yf
+        
+        stock = yf.Ticker(ticker)
+        calendar = stock.calendar
+        
+        if calendar and 'Earnings Date' in calendar:
+            earnings_dates = calendar['Earnings Date']
+            if earnings_dates and len(earnings_dates) > 0:
+                # yfinance returns date objects
+                earnings_date = earnings_dates[0]
+                
+                # Convert to datetime if needed
+                if hasattr(earnings_date, 'year'):
+                    dt = datetime(earnings_date.year, earnings_date.month, earnings_date.day)
+                else:
+                    dt = _parse_ymd(str(earnings_date))
+                
+                # Only return if it's today or in the future
+                if dt >= _today_midnight():
+                    return dt
+        
+        return None
     
-    def get_earnings_date(self, ticker: str, days_ahead: int = 60) -> Optional[datetime]:
+    def _cached_lookup(self, ticker: str, api_key_present_now: bool) -> Tuple[bool, Optional[datetime]]:
         """
-        Get the next earnings date for a ticker using Finnhub API with IB fallback.
-        
-        Args:
-            ticker: Stock symbol
-            days_ahead: How many days ahead to look for earnings
-            
+        Look up a ticker in the cache.
+
         Returns:
-            datetime of next earnings or None if not found
+            (hit, earnings_date) - hit is False when the ticker must be re-fetched
         """
-        # Refresh API key each call (env may be loaded after import).
-        self.api_key = _finnhub_key()
-        api_key_present_now = bool(self.api_key)
+        if ticker not in self.cache or not self._cache_fresh(ticker):
+            return False, None
 
-        # Check cache first.
-        # Important nuance: if we previously cached None *without* a Finnhub key,
-        # and a key is available now, we should re-check Finnhub.
-        if ticker in self.cache and self._cache_fresh(ticker):
-            cached_date = self.cache.get(ticker)
-            if cached_date is None:
-                cached_had_key = bool(self._api_key_present.get(ticker, False))
-                if api_key_present_now and not cached_had_key:
-                    pass  # ignore stale negative cache from a no-key run
-                else:
-                    return None
-            else:
-                # If cached date is in the future or today, use it
-                if cached_date >= datetime.now().replace(hour=0, minute=0, second=0, microsecond=0):
-                    return cached_date
-        
-        # Try Finnhub first
-        source = 'none'
-        earnings_date = self._get_earnings_from_finnhub(ticker, days_ahead)
-        if earnings_date is not None:
-            source = 'finnhub'
+        cached_date_str = self.cache.get(ticker)
+        if cached_date_str is None:
+            # Important nuance: if we previously cached None *without* a Finnhub key,
+            # and a key is available now, we should re-check Finnhub.
+            cached_had_key = bool(self._api_key_present.get(ticker, False))
+            if api_key_present_now and not cached_had_key:
+                return False, None  # ignore stale negative cache from a no-key run
+            return True, None
+
+        # If cached date is in the future or today, use it (ISO dates compare lexicographically)
+        if cached_date_str >= _today_iso():
+            return True, self._as_dt(ticker)
+        return False, None
+
+    def _cached_no_earnings(self, ticker: str) -> bool:
+        """True if a fresh negative cache entry (recorded with a Finnhub key) rules out earnings."""
+        return (
+            ticker in self.cache
+            and self.cache[ticker] is None
+            and bool(self._api_key_present.get(ticker, False))
+            and self._cache_fresh(ticker)
+        )
+
+    def _needs_yahoo(self, earnings_date: Optional[datetime]) -> bool:
+        """True if resolving this Finnhub result will query Yahoo (fallback or confirmation)."""
+        if not self.use_yahoo_fallback:
+            return False
+        return earnings_date is None or CONFIRM_WITH_YFINANCE
+
+    def _get_yahoo_batch(self, tickers: List[str]) -> Dict[str, Optional[datetime]]:
+        """Query Yahoo for several tickers on a thread pool (yfinance is blocking)."""
+        results: Dict[str, Optional[datetime]] = {}
+        if not tickers:
+            return results
+
+        workers = min(EARNINGS_YF_WORKERS, len(tickers))
+        rounds = -(-len(tickers) // workers)
+        executor = ThreadPoolExecutor(max_workers=workers)
+        futures = {executor.submit(self._get_earnings_from_yahoo, ticker): ticker for ticker in tickers}
+        try:
+            # Budget EARNINGS_YF_TIMEOUT_SECONDS per future, allowing for queueing on the pool.
+            for future in as_completed(futures, timeout=EARNINGS_YF_TIMEOUT_SECONDS * rounds):
+                ticker = futures[future]
+                try:
+                    results[ticker] = future.result()
+                except Exception:
+                    results[ticker] = None
+        except FuturesTimeoutError:
+            pending = [t for f, t in futures.items() if not f.done()]
+            print(f"    Warning: Yahoo lookups timed out for {len(pending)} ticker(s)")
+        finally:
+            # Drop queued lookups without waiting (shutdown(cancel_futures=) needs Python 3.9+)
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
+        return results
+
+    def _resolve_and_store(self, ticker: str, earnings_date: Optional[datetime],
+                           api_key_present_now: bool, yahoo_date: Any = _NOT_FETCHED) -> Optional[datetime]:
+        """
+        Confirm/fall back to Yahoo for a Finnhub result, then cache it (without saving).
+
+        yahoo_date may carry a result already fetched by a batch lookup.
+        """
+        source = 'finnhub' if earnings_date is not None else 'none'
 
         # Confirm with Yahoo Finance if available (sanity check)
         if earnings_date is not None and self.use_yahoo_fallback and CONFIRM_WITH_YFINANCE:
-            yahoo_date = self._get_earnings_from_yahoo(ticker)
+            if yahoo_date is _NOT_FETCHED:
+                yahoo_date = self._get_earnings_from_yahoo(ticker)
             if yahoo_date is not None:
                 try:
                     diff_days = abs((earnings_date - yahoo_date).days)
@@ -217,19 +515,156 @@ class EarningsChecker:
         
         # If Finnhub returns None, try Yahoo Finance as fallback
         if earnings_date is None and self.use_yahoo_fallback:
-            earnings_date = self._get_earnings_from_yahoo(ticker)
+            if yahoo_date is _NOT_FETCHED:
+                yahoo_date = self._get_earnings_from_yahoo(ticker)
+            earnings_date = yahoo_date
             if earnings_date:
                 source = 'yahoo'
                 print(f"    [Yahoo] Found earnings for {ticker}: {earnings_date.strftime('%Y-%m-%d')}")
         
         # Cache the result
-        self.cache[ticker] = earnings_date
-        self._checked_at[ticker] = time.time()
-        self._api_key_present[ticker] = api_key_present_now
-        self._source[ticker] = source
-        self._save_cache()
+        with self._lock:
+            if earnings_date is not None:
+                self.cache[ticker] = earnings_date.strftime('%Y-%m-%d')
+                self._cache_dt[ticker] = earnings_date
+            else:
+                self.cache[ticker] = None
+                self._cache_dt.pop(ticker, None)
+            self._checked_at[ticker] = time.time()
+            self._api_key_present[ticker] = api_key_present_now
+            self._source[ticker] = source
+            self._dirty = True
+        
+        return earnings_date
+
+    def get_earnings_date(self, ticker: str, days_ahead: int = 60) -> Optional[datetime]:
+        """
+        Get the next earnings date for a ticker using Finnhub API with IB fallback.
+        
+        Args:
+            ticker: Stock symbol
+            days_ahead: How many days ahead to look for earnings
+            
+        Returns:
+            datetime of next earnings or None if not found
+        """
+        # Refresh API key each call (env may be loaded after import).
+        self._refresh_api_key()
+        api_key_present_now = bool(self.api_key)
+
+        # Check cache first.
+        hit, cached_date = self._cached_lookup(ticker, api_key_present_now)
+        if hit:
+            return cached_date
+        
+        # Try Finnhub first
+        covered, earnings_date = self._calendar_lookup(ticker, days_ahead)
+        if not covered:
+            earnings_date = self._get_earnings_from_finnhub(ticker, days_ahead)
+        earnings_date = self._resolve_and_store(ticker, earnings_date, api_key_present_now)
+        self._maybe_save_cache()
         
         return earnings_date
+
+    def _prefetch_calendar(self, days_ahead: int = 60) -> bool:
+        """
+        Fetch the full Finnhub earnings calendar for the window in a single request.
+
+        Omitting `symbol=` returns every reported company, so later lookups for
+        tickers inside the window need no per-ticker HTTP call.
+
+        Returns:
+            True if the calendar index was (re)built
+        """
+        self._refresh_api_key()
+        if not self.api_key:
+            return False
+        today = _today_midnight().date()
+        if self._calendar_index is not None and self._calendar_day == today and self._calendar_days_ahead >= days_ahead:
+            return True
+        try:
+            from_date = today.strftime('%Y-%m-%d')
+            to_date = (today + timedelta(days=days_ahead)).strftime('%Y-%m-%d')
+            url = f"https://finnhub.io/api/v1/calendar/earnings?from={from_date}&to={to_date}&token={self.api_key}"
+
+            response = self._http.get(url, timeout=30)
+            if response.status_code != 200:
+                return False
+            data = response.json() or {}
+
+            today_dt = _today_midnight()
+            index: Dict[str, List[datetime]] = {}
+            for entry in data.get('earningsCalendar') or []:
+                if not isinstance(entry, dict):
+                    continue
+                symbol = entry.get('symbol')
+                date_str = entry.get('date')
+                if not symbol or not date_str:
+                    continue
+                try:
+                    dt = _parse_ymd(date_str)
+                except Exception:
+                    continue
+                if dt >= today_dt:
+                    index.setdefault(symbol.upper(), []).append(dt)
+
+            self._calendar_index = index
+            self._calendar_days_ahead = days_ahead
+            self._calendar_day = today
+            return True
+
+        except Exception as e:
+            print(f"    Warning: Could not prefetch Finnhub earnings calendar: {e}")
+            return False
+
+    def _calendar_lookup(self, ticker: str, days_ahead: int) -> Tuple[bool, Optional[datetime]]:
+        """
+        Answer a Finnhub lookup from the prefetched calendar.
+
+        Returns:
+            (covered, earnings_date) - covered is False when a per-ticker request is still needed
+        """
+        if self._calendar_index is None or self._calendar_day != _today_midnight().date():
+            return False, None
+        if days_ahead > self._calendar_days_ahead:
+            return False, None
+        dates = self._calendar_index.get(ticker.upper())
+        if not dates:
+            return True, None
+        limit = _today_midnight() + timedelta(days=days_ahead)
+        nearest = min(dates)
+        return True, (nearest if nearest <= limit else None)
+
+    def _finnhub_url(self, ticker: str, days_ahead: int) -> str:
+        today = _today_midnight().date()
+        from_date = today.strftime('%Y-%m-%d')
+        to_date = (today + timedelta(days=days_ahead)).strftime('%Y-%m-%d')
+        return f"https://finnhub.io/api/v1/calendar/earnings?from={from_date}&to={to_date}&symbol={ticker}&token={self.api_key}"
+
+    @staticmethod
+    def _nearest_finnhub_date(data: Any) -> Optional[datetime]:
+        """Pick the nearest future date from a Finnhub /calendar/earnings response."""
+        # Check if we have earnings data
+        if not data or 'earningsCalendar' not in data or len(data['earningsCalendar']) == 0:
+            return None
+
+        # Finnhub does not guarantee ordering; pick the nearest future date.
+        today_dt = _today_midnight()
+        dates: List[datetime] = []
+        for entry in data.get('earningsCalendar', []):
+            if not isinstance(entry, dict):
+                continue
+            date_str = entry.get('date')
+            if not date_str:
+                continue
+            try:
+                dt = _parse_ymd(date_str)
+            except Exception:
+                continue
+            if dt >= today_dt:
+                dates.append(dt)
+
+        return min(dates) if dates else None
     
     def _get_earnings_from_finnhub(self, ticker: str, days_ahead: int = 60) -> Optional[datetime]:
         """
@@ -245,37 +680,12 @@ class EarningsChecker:
         if not self.api_key:
             return None
         try:
-            today = datetime.now().date()
-            from_date = today.strftime('%Y-%m-%d')
-            to_date = (today + timedelta(days=days_ahead)).strftime('%Y-%m-%d')
-            
-            url = f"https://finnhub.io/api/v1/calendar/earnings?from={from_date}&to={to_date}&symbol={ticker}&token={self.api_key}"
+            url = self._finnhub_url(ticker, days_ahead)
             
-            response = requests.get(url, timeout=10)
+            response = self._http.get(url, timeout=10)
             
             if response.status_code == 200:
-                data = response.json()
-                
-                # Check if we have earnings data
-                if data and 'earningsCalendar' in data and len(data['earningsCalendar']) > 0:
-                    # Finnhub does not guarantee ordering; pick the nearest future date.
-                    today_dt = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-                    dates: List[datetime] = []
-                    for entry in data.get('earningsCalendar', []):
-                        if not isinstance(entry, dict):
-                            continue
-                        date_str = entry.get('date')
-                        if not date_str:
-                            continue
-                        try:
-                            dt = datetime.strptime(date_str, '%Y-%m-%d')
-                        except Exception:
-                            continue
-                        if dt >= today_dt:
-                            dates.append(dt)
-
-                    if dates:
-                        return min(dates)
+                return self._nearest_finnhub_date(response.json())
             
             return None
 
@@ -283,14 +693,42 @@ class EarningsChecker:
             print(f"    Warning: Could not fetch earnings from Finnhub for {ticker}: {e}")
             return None
 
+    async def _get_earnings_from_finnhub_async(self, session: 'aiohttp.ClientSession', ticker: str,
+                                               days_ahead: int = 60) -> Optional[datetime]:
+        """
+        Async twin of _get_earnings_from_finnhub for batch lookups.
+
+        Retries when Finnhub rate-limits us (HTTP 429), honouring Retry-After.
+        """
+        if not self.api_key:
+            return None
+        url = self._finnhub_url(ticker, days_ahead)
+        try:
+            for attempt in range(FINNHUB_MAX_RETRIES):
+                async with session.get(url, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                    if response.status == 429:
+                        await asyncio.sleep(_retry_delay(response.headers.get('Retry-After'), attempt))
+                        continue
+                    if response.status != 200:
+                        return None
+                    data = await response.json(content_type=None)
+                return self._nearest_finnhub_date(data)
+
+            print(f"    Warning: Finnhub rate limit persisted for {ticker}")
+            return None
+
+        except Exception as e:
+            print(f"    Warning: Could not fetch earnings from Finnhub for {ticker}: {e}")
+            return None
+
     def has_earnings_within_days(self, ticker: str, days: int) -> bool:
         """True if earnings are within the next N calendar days (including today)."""
-        if days <= 0:
+        if days <= 0 or self._cached_no_earnings(ticker):
             return False
         earnings_date = self.get_earnings_date(ticker, days_ahead=max(days, 60))
         if not earnings_date:
             return False
-        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        today = _today_midnight()
         return today <= earnings_date <= (today + timedelta(days=days))
     
     def has_earnings_before(self, ticker: str, expiry_date: str) -> bool:
@@ -304,8 +742,10 @@ class EarningsChecker:
         Returns:
             True if earnings are before expiry, False otherwise
         """
-        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-        expiry = datetime.strptime(expiry_date, '%Y%m%d')
+        if self._cached_no_earnings(ticker):
+            return False
+        today = _today_midnight()
+        expiry = _parse_expiry(expiry_date)
         days_ahead = max(60, int((expiry - today).days) + 7)
 
         earnings_date = self.get_earnings_date(ticker, days_ahead=days_ahead)
@@ -328,15 +768,18 @@ class EarningsChecker:
         Returns:
             True if earnings fall in the danger zone, False otherwise
         """
-        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-        back = datetime.strptime(back_expiry, '%Y%m%d')
+        return self._has_earnings_in_window_fast(_today_midnight(), ticker, front_expiry, back_expiry)
+
+    def _has_earnings_in_window_fast(self, today: datetime, ticker: str, front_expiry: str, back_expiry: str) -> bool:
+        """has_earnings_in_window with the midnight anchor supplied by the caller."""
+        if self._cached_no_earnings(ticker):
+            return False
+        back = _parse_expiry(back_expiry)
         days_ahead = max(60, int((back - today).days) + 7)
 
         earnings_date = self.get_earnings_date(ticker, days_ahead=days_ahead)
         if not earnings_date:
             return False
-
-        front = datetime.strptime(front_expiry, '%Y%m%d')
         
         # Danger zone: earnings between today and back expiry
         # This catches:
@@ -351,7 +794,7 @@ class EarningsChecker:
         if not earnings_date:
             return None
         
-        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        today = _today_midnight()
         delta = earnings_date - today
         return delta.days
     
@@ -368,21 +811,44 @@ class EarningsChecker:
         """
         filtered = []
         removed_count = 0
+        today = _today_midnight()
+
+        # One lookup per unique ticker, windowed to the furthest back expiry.
+        checkable = [
+            opp for opp in opportunities
+            if opp.get('ticker') and opp.get('expiry1') and opp.get('expiry2')
+        ]
+        earnings_map: Dict[str, Optional[datetime]] = {}
+        if checkable:
+            furthest_back = max(_parse_expiry(opp['expiry2']) for opp in checkable)
+            days_ahead = max(60, int((furthest_back - today).days) + 7)
+            earnings_map = self.check_batch([opp['ticker'] for opp in checkable], days_ahead=days_ahead)
         
+        if NUMPY_AVAILABLE and len(checkable) >= FILTER_VECTORIZE_MIN:
+            # Compare date ordinals for every opportunity in one pass.
+            back = np.fromiter((_expiry_ordinal(opp['expiry2']) for opp in checkable),
+                               dtype=np.int32, count=len(checkable))
+            earn = np.fromiter(
+                (d.toordinal() if d else -1 for d in (earnings_map.get(opp['ticker']) for opp in checkable)),
+                dtype=np.int32, count=len(checkable),
+            )
+            in_window = (earn >= today.toordinal()) & (earn <= back)
+            removed_ids = {id(checkable[i]) for i in np.nonzero(in_window)[0]}
+        else:
+            removed_ids = set()
+            for opp in checkable:
+                earnings_date = earnings_map.get(opp['ticker'])
+                # Danger zone: earnings between today and back expiry (see has_earnings_in_window)
+                if earnings_date and today <= earnings_date <= _parse_expiry(opp['expiry2']):
+                    removed_ids.add(id(opp))
+
         for opp in opportunities:
-            ticker = opp.get('ticker')
-            front_expiry = opp.get('expiry1')
-            back_expiry = opp.get('expiry2')
-            
-            if not all([ticker, front_expiry, back_expiry]):
-                filtered.append(opp)
-                continue
-            
-            if self.has_earnings_in_window(ticker, front_expiry, back_expiry):
+            if id(opp) in removed_ids:
                 removed_count += 1
-                earnings_date = self.get_earnings_date(ticker)
-                days = self.get_days_to_earnings(ticker)
                 if verbose:
+                    ticker = opp['ticker']
+                    earnings_date = earnings_map[ticker]
+                    days = (earnings_date - today).days
                     print(f"    [EARNINGS] REMOVED {ticker}: Earnings on {earnings_date.strftime('%Y-%m-%d')} ({days} days) - in trading window")
             else:
                 filtered.append(opp)
@@ -392,38 +858,160 @@ class EarningsChecker:
         
         return filtered
     
-    def check_batch(self, tickers: List[str]) -> Dict[str, Optional[datetime]]:
+    async def check_batch_async(self, tickers: List[str], days_ahead: int = 60) -> Dict[str, Optional[datetime]]:
+        """
+        Check earnings dates for a batch of tickers, fetching from Finnhub concurrently.
+        
+        Args:
+            tickers: List of stock symbols
+            days_ahead: How many days ahead to look for earnings
+            
+        Returns:
+            Dict mapping ticker to earnings date (or None)
+        """
+        self._refresh_api_key()
+        api_key_present_now = bool(self.api_key)
+
+        results: Dict[str, Optional[datetime]] = {}
+        pending: List[str] = []
+        for ticker in dict.fromkeys(tickers):
+            hit, cached_date = self._cached_lookup(ticker, api_key_present_now)
+            if hit:
+                results[ticker] = cached_date
+            else:
+                pending.append(ticker)
+
+        if not pending:
+            return results
+
+        # One calendar request covers every ticker in the window; only the rest need per-ticker calls.
+        finnhub_dates: Dict[str, Optional[datetime]] = {}
+        if self.api_key:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self._prefetch_calendar, days_ahead)
+            for ticker in pending:
+                covered, earnings_date = self._calendar_lookup(ticker, days_ahead)
+                if covered:
+                    finnhub_dates[ticker] = earnings_date
+        uncovered = [ticker for ticker in pending if ticker not in finnhub_dates]
+
+        if uncovered and AIOHTTP_AVAILABLE and self.api_key:
+            semaphore = asyncio.Semaphore(FINNHUB_MAX_CONCURRENCY)
+            connector = aiohttp.TCPConnector(limit_per_host=FINNHUB_MAX_CONCURRENCY)
+
+            async with aiohttp.ClientSession(connector=connector) as session:
+                async def _fetch(ticker: str) -> Optional[datetime]:
+                    async with semaphore:
+                        return await self._get_earnings_from_finnhub_async(session, ticker, days_ahead)
+
+                tasks = [asyncio.create_task(_fetch(ticker)) for ticker in uncovered]
+                fetched = await asyncio.gather(*tasks, return_exceptions=True)
+
+            for ticker, dt in zip(uncovered, fetched):
+                finnhub_dates[ticker] = None if isinstance(dt, BaseException) else dt
+        else:
+            for ticker in uncovered:
+                finnhub_dates[ticker] = self._get_earnings_from_finnhub(ticker, days_ahead)
+
+        # Yahoo fallback/confirmation is the slow part of a cold batch; fan it out.
+        yahoo_tickers = [ticker for ticker in pending if self._needs_yahoo(finnhub_dates[ticker])]
+        yahoo_set = set(yahoo_tickers)
+        yahoo_dates: Dict[str, Optional[datetime]] = {}
+        if yahoo_tickers:
+            loop = asyncio.get_running_loop()
+            yahoo_dates = await loop.run_in_executor(None, self._get_yahoo_batch, yahoo_tickers)
+
+        for ticker in pending:
+            results[ticker] = self._resolve_and_store(
+                ticker,
+                finnhub_dates[ticker],
+                api_key_present_now,
+                yahoo_date=yahoo_dates.get(ticker) if ticker in yahoo_set else _NOT_FETCHED,
+            )
+        self._save_cache()
+
+        return results
+
+    def check_batch(self, tickers: List[str], days_ahead: int = 60) -> Dict[str, Optional[datetime]]:
         """
         Check earnings dates for a batch of tickers.
         
         Args:
             tickers: List of stock symbols
+            days_ahead: How many days ahead to look for earnings
             
         Returns:
             Dict mapping ticker to earnings date (or None)
         """
-        results = {}
-        for ticker in tickers:
-            results[ticker] = self.get_earnings_date(ticker)
+        self._refresh_api_key()
+        api_key_present_now = bool(self.api_key)
+
+        # Fresh cache hits need no event loop at all.
+        results: Dict[str, Optional[datetime]] = {}
+        pending: List[str] = []
+        for ticker in dict.fromkeys(tickers):
+            hit, cached_date = self._cached_lookup(ticker, api_key_present_now)
+            if hit:
+                results[ticker] = cached_date
+            else:
+                pending.append(ticker)
+
+        if not pending:
+            return results
+
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # asyncio.run clears the calling thread's event loop when it finishes,
+            # which breaks ib_insync on the thread that owns the IB connection.
+            # Run the batch on a private thread so the caller's loop is untouched.
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                results.update(executor.submit(
+                    asyncio.run, self.check_batch_async(pending, days_ahead=days_ahead)
+                ).result())
+            return results
+
+        # Already inside an event loop (e.g. ib_insync); fall back to sequential lookups.
+        for ticker in pending:
+            results[ticker] = self.get_earnings_date(ticker, days_ahead=days_ahead)
         return results
 
 
 # Test the module
 if __name__ == "__main__":
-    print("Testing Earnings Checker...\n")
+    import logging
+    import logging.handlers
+    import sys
+
+    # Buffer per-ticker lines and emit them in chunks instead of one write per ticker.
+    if hasattr(sys.stdout, 'reconfigure'):
+        sys.stdout.reconfigure(write_through=False)
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter('%(message)s'))
+    buffered = logging.handlers.MemoryHandler(capacity=50, flushLevel=logging.ERROR, target=stream_handler)
+    log = logging.getLogger('earnings_checker')
+    log.setLevel(logging.INFO)
+    log.addHandler(buffered)
+    log.propagate = False
+
+    log.info("Testing Earnings Checker...\n")
     
     checker = EarningsChecker()
     
     # Test some tickers
     test_tickers = ['AAPL', 'MSFT', 'AEO', 'NVDA', 'AMD']
+    earnings_map = checker.check_batch(test_tickers, days_ahead=180)
+    today = _today_midnight()
     
     for ticker in test_tickers:
-        earnings_date = checker.get_earnings_date(ticker)
-        days = checker.get_days_to_earnings(ticker)
+        earnings_date = earnings_map.get(ticker)
         
         if earnings_date:
-            print(f"{ticker}: Earnings on {earnings_date.strftime('%Y-%m-%d')} ({days} days away)")
+            days = (earnings_date - today).days
+            log.info(f"{ticker}: Earnings on {earnings_date.strftime('%Y-%m-%d')} ({days} days away)")
         else:
-            print(f"{ticker}: No earnings date found")
+            log.info(f"{ticker}: No earnings date found")
+    buffered.flush()
     
-    print("\n[OK] Earnings checker is working!")
+    log.info("\n[OK] Earnings checker is working!")
+    buffered.flush()
@@ -2,12 +2,23 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
+from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
 
 from env_loader import load_env
 from earnings_checker import EarningsChecker
 
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+# Result files at least this large are enriched by streaming opportunities one at a time.
+STREAM_THRESHOLD_BYTES = 2_000_000
+
 
 def _load_json(path: Path) -> Dict[str, Any]:
     with path.open('r', encoding='utf-8') as f:
@@ -24,33 +35,149 @@ def _enrich_opportunities(payload: Dict[str, Any], checker: EarningsChecker) ->
     if not isinstance(opps, list):
         return 0
 
+    earnings_map = _resolve_earnings(opps, checker)
+
     updated = 0
     for opp in opps:
-        if not isinstance(opp, dict):
-            continue
-        ticker = opp.get('ticker')
-        if not isinstance(ticker, str) or not ticker.strip():
-            continue
+        if _enrich_one(opp, earnings_map):
+            updated += 1
+
+    return updated
 
-        existing = opp.get('next_earnings')
-        if isinstance(existing, str) and existing.strip():
+
+def _pending_ticker(opp: Any) -> Optional[str]:
+    """Normalized ticker if opp still needs next_earnings, else None."""
+    if not isinstance(opp, dict):
+        return None
+    ticker = opp.get('ticker')
+    if not isinstance(ticker, str) or not ticker.strip():
+        return None
+
+    existing = opp.get('next_earnings')
+    if isinstance(existing, str) and existing.strip():
+        return None
+    return ticker.strip().upper()
+
+
+def _resolve_earnings(opps: Iterable[Any], checker: EarningsChecker) -> Dict[str, Optional[datetime]]:
+    """One batch lookup per unique pending ticker, windowed to the file's longest dte2."""
+    tickers: Dict[str, None] = {}
+    max_dte2 = 0
+    for opp in opps:
+        ticker = _pending_ticker(opp)
+        if ticker is None:
             continue
+        tickers[ticker] = None
 
         dte2 = opp.get('dte2')
         try:
             dte2_int = int(dte2) if dte2 is not None else 0
         except Exception:
             dte2_int = 0
+        max_dte2 = max(max_dte2, dte2_int)
+
+    if not tickers:
+        return {}
+    days_ahead = max(180, max_dte2 + 14)
+    return checker.check_batch(list(tickers), days_ahead=days_ahead)
 
-        days_ahead = max(180, dte2_int + 14)
-        dt = checker.get_earnings_date(ticker.strip().upper(), days_ahead=days_ahead)
-        if dt:
-            opp['next_earnings'] = dt.strftime('%Y-%m-%d')
-            updated += 1
 
+def _enrich_one(opp: Any, earnings_map: Dict[str, Optional[datetime]]) -> bool:
+    """Fill opp['next_earnings'] in place from earnings_map; True if it was set."""
+    ticker = _pending_ticker(opp)
+    if ticker is None:
+        return False
+
+    dt = earnings_map.get(ticker)
+    if dt:
+        opp['next_earnings'] = dt.strftime('%Y-%m-%d')
+        return True
+    return False
+
+
+def _build_value(events: Iterator[Tuple[str, str, Any]], event: str, value: Any) -> Any:
+    """Assemble one JSON value from ijson events, starting at (event, value)."""
+    builder = ijson.ObjectBuilder()
+    builder.event(event, value)
+    depth = 1 if event in ('start_map', 'start_array') else 0
+    while depth:
+        _, event, value = next(events)
+        builder.event(event, value)
+        if event in ('start_map', 'start_array'):
+            depth += 1
+        elif event in ('end_map', 'end_array'):
+            depth -= 1
+    return builder.value
+
+
+def _dump_nested(value: Any, level: int) -> str:
+    """json.dumps(indent=2) of value as it would appear `level` levels deep."""
+    return json.dumps(value, indent=2).replace('\n', '\n' + '  ' * level)
+
+
+def _stream_enrich(src: Path, out: TextIO, earnings_map: Dict[str, Optional[datetime]]) -> int:
+    """Copy src to out, enriching opportunities one at a time.
+
+    Output is byte-identical to json.dump(payload, indent=2) of the enriched payload,
+    but only one opportunity is held in memory at a time.
+    """
+    updated = 0
+    with src.open('rb') as f:
+        events = ijson.parse(f, use_float=True)
+        _, event, _ = next(events)
+        if event != 'start_map':
+            raise ValueError('results JSON must be an object')
+
+        out.write('{')
+        first_key = True
+        for _, event, value in events:
+            if event == 'end_map':
+                break
+            # event == 'map_key' at the top level
+            out.write(('' if first_key else ',') + '\n  ' + json.dumps(value) + ': ')
+            first_key = False
+            key = value
+
+            _, event, value = next(events)
+            if key != 'opportunities' or event != 'start_array':
+                out.write(_dump_nested(_build_value(events, event, value), 1))
+                continue
+
+            out.write('[')
+            first_item = True
+            for _, event, value in events:
+                if event == 'end_array':
+                    break
+                opp = _build_value(events, event, value)
+                if _enrich_one(opp, earnings_map):
+                    updated += 1
+                out.write(('' if first_item else ',') + '\n    ' + _dump_nested(opp, 2))
+                first_item = False
+            out.write(']' if first_item else '\n  ]')
+        out.write('}' if first_key else '\n}')
     return updated
 
 
+def _enrich_file_streaming(path: Path, checker: EarningsChecker) -> int:
+    """Enrich a large results file without loading it whole; rewrites only if something changed."""
+    # First pass only collects tickers/dte2 so the lookup can be batched.
+    with path.open('rb') as f:
+        earnings_map = _resolve_earnings(ijson.items(f, 'opportunities.item', use_float=True), checker)
+    if not earnings_map:
+        return 0
+
+    tmp = path.with_name(path.name + '.tmp')
+    try:
+        with tmp.open('w', encoding='utf-8') as out:
+            updated = _stream_enrich(path, out, earnings_map)
+        if updated:
+            os.replace(tmp, path)
+        return updated
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(description='Enrich scan results JSON with next earnings dates.')
     parser.add_argument('files', nargs='*', help='Result JSON files to update (in-place).')
@@ -74,10 +201,13 @@ def main() -> int:
             print(f'Skipping missing: {path}')
             continue
 
-        payload = _load_json(path)
-        updated = _enrich_opportunities(payload, checker)
-        if updated:
-            _save_json(path, payload)
+        if IJSON_AVAILABLE and path.stat().st_size >= STREAM_THRESHOLD_BYTES:
+            updated = _enrich_file_streaming(path, checker)
+        else:
+            payload = _load_json(path)
+            updated = _enrich_opportunities(payload, checker)
+            if updated:
+                _save_json(path, payload)
         total_updates += updated
         print(f'{path}: updated {updated}')
 
@@ -1,35 +1,62 @@
 from __future__ import annotations
 
 import os
+import re
+import stat
 from pathlib import Path
+from typing import Dict, Optional, Tuple
 
+# KEY=VALUE with optional surrounding whitespace; comments and blank lines never match.
+_ENV_RE = re.compile(r"^\s*([A-Za-z_][A-Za-z0-9_]*)\s*=\s*(.*?)\s*$")
 
-def _load_env_file(path: Path) -> bool:
+# Parsed files keyed by path -> (mtime, values), so repeat load_env calls skip the I/O.
+_ENV_CACHE: Dict[Path, Tuple[float, Dict[str, str]]] = {}
+
+
+def _parse_env_file(path: Path) -> Dict[str, str]:
+    values: Dict[str, str] = {}
+    with path.open("r", encoding="utf-8") as f:
+        for raw_line in f:
+            m = _ENV_RE.match(raw_line)
+            if m is None:
+                continue
+            # First assignment wins, matching the no-override rule for os.environ.
+            values.setdefault(m.group(1), m.group(2).strip("\"'"))
+    return values
+
+
+def _load_env_file(path: Path, st: Optional[os.stat_result] = None) -> bool:
     """Load KEY=VALUE lines into os.environ (no overrides).
 
     Lightweight .env reader to support Task Scheduler / .bat / direct script runs.
+    Pass `st` when the caller already has the file's stat result.
     """
-    if not path.exists() or not path.is_file():
+    if st is None:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return False
+    if not stat.S_ISREG(st.st_mode):
         return False
 
-    loaded_any = False
     try:
-        for raw_line in path.read_text(encoding="utf-8").splitlines():
-            line = raw_line.strip()
-            if not line or line.startswith("#") or "=" not in line:
-                continue
-            key, value = line.split("=", 1)
-            key = key.strip()
-            value = value.strip().strip('"').strip("'")
-            if not key:
-                continue
-            if key in os.environ and (os.environ.get(key) or "").strip():
-                continue
-            os.environ[key] = value
-            loaded_any = True
+        mtime = st.st_mtime
+        cached = _ENV_CACHE.get(path)
+        if cached is not None and cached[0] == mtime:
+            values = cached[1]
+        else:
+            values = _parse_env_file(path)
+            _ENV_CACHE[path] = (mtime, values)
     except Exception:
         return False
 
+    loaded_any = False
+    for key, value in values.items():
+        if key in os.environ and (os.environ.get(key) or "").strip():
+            continue
+        os.environ[key] = value
+        loaded_any = True
+
     return loaded_any
 
 
@@ -46,5 +73,15 @@ def load_env(script_file: str | Path) -> None:
         script_dir.parent / ".env",
     ]
 
+    # FORWARD_VOL_ENV_STOP_ON_FIRST=1 skips the remaining candidates once one file loads.
+    stop_on_first = os.environ.get("FORWARD_VOL_ENV_STOP_ON_FIRST", "").strip() == "1"
+
     for candidate in candidates:
-        _load_env_file(candidate)
+        try:
+            st = os.stat(candidate)
+        except OSError:
+            continue
+        if not stat.S_ISREG(st.st_mode):
+            continue
+        if _load_env_file(candidate, st) and stop_on_first:
+            break
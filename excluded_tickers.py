@@ -1,15 +1,27 @@
 from __future__ import annotations
 
+import atexit
 import json
 import os
 import time
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from typing import Any, Dict, Optional
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Default: exclusions expire after 7 days.  Override via EXCLUDE_TICKERS_TTL_DAYS env var.
 _DEFAULT_TTL_DAYS = 7
 
 
+# Scan loops ask about the same symbols over and over; reuse the uppercased strings.
+_upper = lru_cache(maxsize=4096)(str.upper)
+
+
 def _utc_now_iso() -> str:
     return datetime.now(timezone.utc).replace(microsecond=0).isoformat()
 
@@ -25,6 +37,10 @@ def _parse_iso(s: str) -> Optional[datetime]:
 class ExcludedTickers:
     """JSON-backed persistent exclude list for tickers that IB cannot qualify.
 
+    New exclusions are appended to a JSONL journal next to the snapshot
+    (``<path>.jsonl``) and folded back into the snapshot by ``compact()``,
+    which runs on forced saves and at interpreter exit.
+
     Structure on disk (v1):
       {
         "version": 1,
@@ -45,6 +61,7 @@ class ExcludedTickers:
         ttl_days: Optional[float] = None,
     ) -> None:
         self.path = path
+        self._journal_path = f"{path}.jsonl"
         self.enabled = enabled
         self.autosave = autosave
         self.min_seconds_between_saves = float(min_seconds_between_saves)
@@ -63,24 +80,67 @@ class ExcludedTickers:
         }
         self._dirty = False
         self._last_save_ts = 0.0
+        # Uppercased ticker -> epoch seconds at which its exclusion lapses.
+        self._expires_at: Dict[str, float] = {}
 
         if self.enabled:
             self.load()
             self._prune_expired()
+            atexit.register(self._flush)
 
     def load(self) -> None:
         if not self.enabled:
             return
 
         try:
-            if not os.path.exists(self.path):
-                return
-            with open(self.path, "r", encoding="utf-8") as f:
-                loaded = json.load(f)
-            if isinstance(loaded, dict) and isinstance(loaded.get("tickers"), dict):
-                self._data = loaded
+            if os.path.exists(self.path):
+                if ORJSON_AVAILABLE:
+                    with open(self.path, "rb") as f:
+                        loaded = orjson.loads(f.read())
+                else:
+                    with open(self.path, "r", encoding="utf-8") as f:
+                        loaded = json.load(f)
+                if isinstance(loaded, dict) and isinstance(loaded.get("tickers"), dict):
+                    self._data = loaded
         except Exception:
             # If the file is corrupt or unreadable, do not break the scan.
+            pass
+        self._rebuild_index()
+        self._replay_journal()
+
+    def _expiry_ts(self, record: Dict[str, Any]) -> float:
+        """Epoch seconds after which the record counts as expired (see _is_expired)."""
+        if self.ttl_days <= 0:
+            return float("inf")
+        last_seen = _parse_iso(record.get("last_seen", ""))
+        if last_seen is None:
+            return 0.0
+        return last_seen.timestamp() + self.ttl_days * 86400.0
+
+    def _rebuild_index(self) -> None:
+        self._expires_at = {
+            t: self._expiry_ts(rec) for t, rec in self._data.get("tickers", {}).items()
+        }
+
+    def _replay_journal(self) -> None:
+        """Apply exclusions appended since the last compaction."""
+        try:
+            if not os.path.exists(self._journal_path):
+                return
+            replayed = False
+            with open(self._journal_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        ticker_u = str(entry["ticker"]).upper()
+                    except Exception:
+                        # A torn final line from a crash; skip it.
+                        continue
+                    self._apply_add(ticker_u, entry.get("reason", ""), entry.get("source", ""), entry.get("ts") or _utc_now_iso())
+                    replayed = True
+            if replayed:
+                self._dirty = True
+        except Exception:
             return
 
     def _is_expired(self, record: Dict[str, Any]) -> bool:
@@ -100,6 +160,7 @@ class ExcludedTickers:
         if expired:
             for t in expired:
                 del tickers[t]
+                self._expires_at.pop(t, None)
             self._data["updated_at"] = _utc_now_iso()
             self._dirty = True
             if self.autosave:
@@ -110,12 +171,14 @@ class ExcludedTickers:
             return False
         if not ticker:
             return False
-        record = self._data.get("tickers", {}).get(ticker.upper())
-        if record is None:
+        ticker_u = _upper(ticker)
+        expires_at = self._expires_at.get(ticker_u)
+        if expires_at is None:
             return False
-        if self._is_expired(record):
+        if time.time() > expires_at:
             # Lazily remove expired entry
-            self._data["tickers"].pop(ticker.upper(), None)
+            self._data["tickers"].pop(ticker_u, None)
+            del self._expires_at[ticker_u]
             self._dirty = True
             return False
         return True
@@ -136,9 +199,18 @@ class ExcludedTickers:
             return False
 
         ticker_u = ticker.upper()
-        tickers = self._data.setdefault("tickers", {})
         now = _utc_now_iso()
+        changed = self._apply_add(ticker_u, reason, source, now)
 
+        if changed:
+            self._dirty = True
+            if self.autosave:
+                self._append_journal(ticker_u, reason, source, now)
+        return changed
+
+    def _apply_add(self, ticker_u: str, reason: Any, source: Any, now: str) -> bool:
+        """Merge one exclusion into the in-memory data."""
+        tickers = self._data.setdefault("tickers", {})
         existing = tickers.get(ticker_u)
         if existing is None:
             tickers[ticker_u] = {
@@ -161,11 +233,19 @@ class ExcludedTickers:
 
         if changed:
             self._data["updated_at"] = now
-            self._dirty = True
-            if self.autosave:
-                self.save_if_needed()
+            self._expires_at[ticker_u] = self._expiry_ts(tickers[ticker_u])
         return changed
 
+    def _append_journal(self, ticker_u: str, reason: Any, source: Any, now: str) -> None:
+        """Append a single exclusion record; O(record) instead of rewriting the snapshot."""
+        record = {"ticker": ticker_u, "reason": str(reason)[:500], "source": str(source)[:80], "ts": now}
+        try:
+            with open(self._journal_path, "a", encoding="utf-8", buffering=1) as f:
+                f.write(json.dumps(record, sort_keys=True) + "\n")
+        except Exception:
+            # Fall back to a full rewrite so the exclusion is not lost.
+            self.save_if_needed()
+
     def save_if_needed(self, *, force: bool = False) -> None:
         if not self.enabled:
             return
@@ -176,13 +256,32 @@ class ExcludedTickers:
         if not force and (now_ts - self._last_save_ts) < self.min_seconds_between_saves:
             return
 
+        self.compact()
+        self._last_save_ts = now_ts
+
+    def compact(self) -> None:
+        """Rewrite the snapshot atomically and truncate the journal."""
+        if not self.enabled:
+            return
         self._atomic_write_json(self.path, self._data)
+        try:
+            os.remove(self._journal_path)
+        except FileNotFoundError:
+            pass
         self._dirty = False
-        self._last_save_ts = now_ts
+
+    def _flush(self) -> None:
+        """atexit hook: fold any journaled exclusions into the snapshot."""
+        if self._dirty:
+            try:
+                self.compact()
+            except Exception:
+                pass
 
     def clear_all(self) -> None:
         """Remove all exclusions."""
         self._data["tickers"] = {}
+        self._expires_at.clear()
         self._data["updated_at"] = _utc_now_iso()
         self._dirty = True
         self.save_if_needed(force=True)
@@ -192,6 +291,7 @@ class ExcludedTickers:
         ticker_u = ticker.upper()
         if ticker_u in self._data.get("tickers", {}):
             del self._data["tickers"][ticker_u]
+            self._expires_at.pop(ticker_u, None)
             self._data["updated_at"] = _utc_now_iso()
             self._dirty = True
             if self.autosave:
@@ -203,6 +303,10 @@ class ExcludedTickers:
     def _atomic_write_json(path: str, payload: Dict[str, Any]) -> None:
         os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
         tmp = f"{path}.tmp"
-        with open(tmp, "w", encoding="utf-8") as f:
-            json.dump(payload, f, indent=2, sort_keys=True)
+        if ORJSON_AVAILABLE:
+            with open(tmp, "wb") as f:
+                f.write(orjson.dumps(payload, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS))
+        else:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(payload, f, indent=2, sort_keys=True)
         os.replace(tmp, path)
@@ -14,12 +14,42 @@ Usage:
     3. Import the generated trades.json file into the Trade Tracker web app
 """
 
-from ib_insync import IB, Stock, Option
+from ib_insync import IB, Stock, Option, util
+import asyncio
 import json
+import numpy as np
 from datetime import datetime, date
 from collections import defaultdict
 import os
 import random
+import time
+
+# Upper bound on how long to wait for quotes; returns earlier once every ticker has a price.
+MKT_DATA_TIMEOUT_SECONDS = 5.0
+# Contracts quoted per wave; stays under TWS's default 100 simultaneous market data lines
+MKT_DATA_WAVE_SIZE = max(1, int(os.environ.get('MKT_DATA_WAVE_SIZE', '90')))
+
+# Per-ticker price debugging output (set IB_POSITIONS_DEBUG=1 to enable).
+DEBUG = os.environ.get('IB_POSITIONS_DEBUG', '').strip() == '1'
+
+# Qualified contracts for this run; contract details don't change within a session.
+_contract_cache = {}
+
+# Snapshot tickers for this run, keyed by conId (filled by snapshot_quotes).
+_ticker_cache = {}
+
+
+def _allow_nested_event_loop():
+    """
+    Let ib_insync's blocking calls (connect, waitOnUpdate, sleep) run inside an
+    already-running asyncio loop, e.g. Jupyter or a larger async app. Without
+    this they fail with 'This event loop is already running'.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return  # plain script: nothing to patch
+    util.patchAsyncio()
 
 
 def connect_to_ib(host='127.0.0.1', port=7497, client_id=None):
@@ -41,6 +71,8 @@ def connect_to_ib(host='127.0.0.1', port=7497, client_id=None):
         else:
             client_id = 110
 
+    _allow_nested_event_loop()
+
     # If the requested clientId is already in use, retry with a different one.
     # This makes the daily runner resilient to orphaned sessions or concurrent tools.
     for attempt in range(6):
@@ -73,6 +105,116 @@ def connect_to_ib(host='127.0.0.1', port=7497, client_id=None):
     raise RuntimeError("Unable to connect to IB: all clientId retries failed")
 
 
+def make_stock(symbol):
+    """US stock contract routed via SMART (the underlying for every option leg here)."""
+    return Stock(symbol, 'SMART', 'USD')
+
+
+def _contract_key(contract):
+    return (
+        contract.symbol,
+        contract.secType,
+        contract.exchange,
+        contract.currency,
+        getattr(contract, 'lastTradeDateOrContractMonth', ''),
+        getattr(contract, 'strike', 0.0),
+        getattr(contract, 'right', ''),
+    )
+
+
+def qualify_cached(ib, *contracts):
+    """
+    Qualify contracts, asking IB only about ones not qualified earlier in this run.
+    
+    Returns:
+        Qualified contracts in the same order as given
+    """
+    missing = {}
+    for contract in contracts:
+        key = _contract_key(contract)
+        if key not in _contract_cache:
+            missing.setdefault(key, contract)
+    if missing:
+        ib.qualifyContracts(*missing.values())
+        for key, contract in missing.items():
+            if contract.conId:
+                _contract_cache[key] = contract
+    return [_contract_cache.get(_contract_key(c), c) for c in contracts]
+
+
+def snapshot_quotes(ib, option_contracts):
+    """
+    Qualify option contracts plus their underlyings and snapshot every one not yet
+    quoted this run, MKT_DATA_WAVE_SIZE contracts at a time with one wait per wave.
+    
+    Options stream with generic tick 106 (implied vol / model price) so the
+    modelGreeks fallback in get_option_price has data; IB rejects generic ticks
+    on snapshot requests, so those streams are cancelled once the wait is over.
+    Stocks use plain snapshots, which end on their own.
+    
+    Returns:
+        (qualified option contracts, {symbol: qualified underlying Stock});
+        tickers are in _ticker_cache by conId
+    """
+    option_contracts = list(option_contracts)
+    underlyings = {symbol: make_stock(symbol) for symbol in dict.fromkeys(c.symbol for c in option_contracts)}
+    qualified = qualify_cached(ib, *option_contracts, *underlyings.values())
+    underlyings = dict(zip(underlyings, qualified[len(option_contracts):]))
+    
+    todo = list({c.conId: c for c in qualified if c.conId not in _ticker_cache}.values())
+    for start in range(0, len(todo), MKT_DATA_WAVE_SIZE):
+        _snapshot_wave(ib, todo[start:start + MKT_DATA_WAVE_SIZE])
+    return qualified[:len(option_contracts)], underlyings
+
+
+def _snapshot_wave(ib, contracts):
+    """Request and wait for one wave of quotes; its option streams are always cancelled."""
+    new_tickers = []
+    streaming = []
+    try:
+        for contract in contracts:
+            if contract.secType == 'OPT':
+                ticker = ib.reqMktData(contract, '106', False, False)
+                streaming.append(contract)
+            else:
+                ticker = ib.reqMktData(contract, '', True, False)
+            _ticker_cache[contract.conId] = ticker
+            new_tickers.append(ticker)
+        if new_tickers:
+            wait_for_tickers(ib, new_tickers)
+    finally:
+        for contract in streaming:
+            try:
+                ib.cancelMktData(contract)
+            except Exception:
+                pass
+
+
+def _has_price(ticker):
+    """True once the ticker has any usable price (last, bid/ask, or close)."""
+    return _positive(ticker.last) or (_positive(ticker.bid) and _positive(ticker.ask)) or _positive(ticker.close)
+
+
+def wait_for_tickers(ib, tickers, timeout=MKT_DATA_TIMEOUT_SECONDS):
+    """
+    Block until every ticker has a price or the timeout expires.
+    
+    Wakes on each incoming IB update (ib.waitOnUpdate) instead of sleeping a fixed
+    amount, so the wait is as long as the slowest quote takes to arrive.
+    
+    Returns:
+        True if all tickers have a price, False on timeout
+    """
+    deadline = time.monotonic() + timeout
+    waiting = list(tickers)
+    while True:
+        waiting = [t for t in waiting if not _has_price(t)]
+        remaining = deadline - time.monotonic()
+        if not waiting or remaining <= 0:
+            return not waiting
+        ib.waitOnUpdate(timeout=remaining)
+
+
 def get_option_positions(ib):
     """
     Fetch all option positions from IB.
@@ -82,7 +224,11 @@ def get_option_positions(ib):
     """
     print("\n[INFO] Fetching positions from IB...")
     
+    # ib_insync syncs positions during connect, so this is an in-memory read.
     positions = ib.positions()
+    if not positions:
+        # Empty cache may just mean the startup sync hasn't landed; ask IB once explicitly.
+        positions = ib.reqPositions()
     
     option_positions = []
     for position in positions:
@@ -122,91 +268,102 @@ def identify_calendar_spreads(option_positions, ib):
         key = (contract.symbol, contract.strike, contract.right)
         groups[key].append(pos)
     
-    calendar_spreads = []
-    
+    # Pass 1: find short-front / long-back pairs (no IB round-trips yet)
+    pending = []
     for key, positions in groups.items():
         if len(positions) < 2:
             continue
         
         symbol, strike, right = key
         
+        # A group needs at least one short and one long leg to hold a calendar
+        has_short = any(p['position'] < 0 for p in positions)
+        has_long = any(p['position'] > 0 for p in positions)
+        if not (has_short and has_long):
+            continue
+        
         # Sort by expiration date
         positions_sorted = sorted(positions, key=lambda x: x['contract'].lastTradeDateOrContractMonth)
         
-        # Look for pairs: short front month + long back month
-        for i in range(len(positions_sorted) - 1):
-            front = positions_sorted[i]
-            back = positions_sorted[i + 1]
-            
+        # Look for pairs: short front month + long back month (the next expiry).
+        # Pairing each short with every later long would count the same leg twice.
+        for front, back in zip(positions_sorted, positions_sorted[1:]):
             # Calendar spread: short front, long back
             if front['position'] < 0 and back['position'] > 0:
-                quantity = abs(front['position'])
-                
-                # Get current option prices
-                front_contract = front['contract']
-                back_contract = back['contract']
-                
-                # Request market data
-                ib.qualifyContracts(front_contract, back_contract)
-                
-                front_ticker = ib.reqMktData(front_contract, '', False, False)
-                back_ticker = ib.reqMktData(back_contract, '', False, False)
-                ib.sleep(3)  # Wait longer for data
-                
-                # Get underlying price
-                underlying = Stock(symbol, 'SMART', 'USD')
-                ib.qualifyContracts(underlying)
-                underlying_ticker = ib.reqMktData(underlying, '', False, False)
-                ib.sleep(2)  # Wait for underlying data
-                
-                front_current = get_option_price(front_ticker)
-                back_current = get_option_price(back_ticker)
-                underlying_price = get_stock_price(underlying_ticker)
-                
-                # Skip if we couldn't get valid prices
-                if front_current is None or back_current is None or underlying_price is None:
-                    print(f"  [WARN] Skipping {symbol} ${strike} {right} - could not get valid market data")
-                    continue
-                
-                # Calculate entry prices per share
-                # IB avgCost is in cents PER CONTRACT (not total), so just divide by 100 to get dollars
-                # Do NOT divide by position - avgCost is already per-contract
-                front_entry_per_share = abs(front['avgCost']) / 100
-                back_entry_per_share = abs(back['avgCost']) / 100
-                
-                # Calculate unrealized P&L
-                # For short front: PnL = (entry - current) * contracts * 100
-                # For long back: PnL = (current - entry) * contracts * 100
-                front_pnl = (front_entry_per_share - front_current) * abs(front['position']) * 100
-                back_pnl = (back_current - back_entry_per_share) * abs(back['position']) * 100
-                
-                calendar_spreads.append({
-                    'symbol': symbol,
-                    'strike': strike,
-                    'right': right,
-                    'quantity': quantity,
-                    'front': {
-                        'contract': front_contract,
-                        'position': front['position'],
-                        'avgCost': abs(front['avgCost']),
-                        'currentPrice': front_current,
-                        'unrealizedPnL': front_pnl,
-                    },
-                    'back': {
-                        'contract': back_contract,
-                        'position': back['position'],
-                        'avgCost': abs(back['avgCost']),
-                        'currentPrice': back_current,
-                        'unrealizedPnL': back_pnl,
-                    },
-                    'underlying': {
-                        'currentPrice': underlying_price,
-                    }
-                })
-                
-                print(f"  [+] Found: {quantity}x {symbol} ${strike} {right} calendar spread")
-                print(f"    Front: {front_contract.lastTradeDateOrContractMonth} @ ${get_option_price(front_ticker):.2f}")
-                print(f"    Back:  {back_contract.lastTradeDateOrContractMonth} @ ${get_option_price(back_ticker):.2f}")
+                pending.append((symbol, strike, right, front, back))
+    
+    calendar_spreads = []
+    if not pending:
+        print("  [INFO] No calendar spreads found in current positions")
+        return calendar_spreads
+    
+    # Snapshot every leg and underlying at once, then wait a single time
+    _, underlyings = snapshot_quotes(ib, (leg['contract'] for _, _, _, front, back in pending for leg in (front, back)))
+    tickers = _ticker_cache
+    
+    # Pass 2: price each pair from the already-populated tickers
+    for symbol, strike, right, front, back in pending:
+        quantity = abs(front['position'])
+        back_quantity = abs(back['position'])
+        
+        front_contract = front['contract']
+        back_contract = back['contract']
+        front_ticker = tickers[front_contract.conId]
+        back_ticker = tickers[back_contract.conId]
+        underlying_ticker = tickers[underlyings[symbol].conId]
+        
+        front_current = get_option_price(front_ticker)
+        back_current = get_option_price(back_ticker)
+        underlying_price = get_stock_price(underlying_ticker)
+        
+        # Skip if we couldn't get valid prices
+        if front_current is None or back_current is None or underlying_price is None:
+            print(f"  [WARN] Skipping {symbol} ${strike} {right} - could not get valid market data")
+            continue
+        
+        # Calculate entry prices per share
+        # IB avgCost is in cents PER CONTRACT (not total), so just divide by 100 to get dollars
+        # Do NOT divide by position - avgCost is already per-contract
+        front_cost = abs(front['avgCost'])
+        back_cost = abs(back['avgCost'])
+        front_entry_per_share = front_cost / 100
+        back_entry_per_share = back_cost / 100
+        
+        # Calculate unrealized P&L
+        # For short front: PnL = (entry - current) * contracts * 100
+        # For long back: PnL = (current - entry) * contracts * 100
+        front_pnl = (front_entry_per_share - front_current) * quantity * 100
+        back_pnl = (back_current - back_entry_per_share) * back_quantity * 100
+        
+        calendar_spreads.append({
+            'symbol': symbol,
+            'strike': strike,
+            'right': right,
+            'quantity': quantity,
+            'front': {
+                'contract': front_contract,
+                'position': front['position'],
+                'avgCost': front_cost,
+                'entryPrice': front_entry_per_share,
+                'currentPrice': front_current,
+                'unrealizedPnL': front_pnl,
+            },
+            'back': {
+                'contract': back_contract,
+                'position': back['position'],
+                'avgCost': back_cost,
+                'entryPrice': back_entry_per_share,
+                'currentPrice': back_current,
+                'unrealizedPnL': back_pnl,
+            },
+            'underlying': {
+                'currentPrice': underlying_price,
+            }
+        })
+        
+        print(f"  [+] Found: {quantity}x {symbol} ${strike} {right} calendar spread")
+        print(f"    Front: {front_contract.lastTradeDateOrContractMonth} @ ${front_current:.2f}")
+        print(f"    Back:  {back_contract.lastTradeDateOrContractMonth} @ ${back_current:.2f}")
     
     if not calendar_spreads:
         print("  [INFO] No calendar spreads found in current positions")
@@ -214,58 +371,53 @@ def identify_calendar_spreads(option_positions, ib):
     return calendar_spreads
 
 
-def get_option_price(ticker):
-    """Get current option price from ticker, prefer last price, fall back to mid."""
-    import math
-    
-    # Debug: print what we're getting
-    print(f"      Debug - last:{ticker.last}, bid:{ticker.bid}, ask:{ticker.ask}, close:{ticker.close}")
-    
-    # Prefer last price if valid
-    if ticker.last and not math.isnan(ticker.last) and ticker.last > 0:
-        print(f"      Using last: {ticker.last}")
-        return ticker.last
-    
-    # Fall back to mid price (both bid and ask must be valid and positive)
-    if (ticker.bid is not None and ticker.ask is not None and 
-        not math.isnan(ticker.bid) and not math.isnan(ticker.ask) and
-        ticker.bid > 0 and ticker.ask > 0):
-        mid = (ticker.bid + ticker.ask) / 2
-        print(f"      Using mid: {mid}")
-        return mid
-    
-    # Fall back to close
-    if ticker.close and not math.isnan(ticker.close) and ticker.close > 0:
-        print(f"      Using close: {ticker.close}")
-        return ticker.close
+def _positive(value):
+    """True for a real, positive price (rejects None, NaN, 0 and IB's -1 placeholders)."""
+    return value is not None and value == value and value > 0
+
+
+def _ticker_price(ticker, use_model=False):
+    """Best available price: last, then bid/ask mid, then close, then (optionally) model price."""
+    if DEBUG:
+        print(f"      Debug - last:{ticker.last}, bid:{ticker.bid}, ask:{ticker.ask}, close:{ticker.close}")
     
-    # Last resort: model price
-    if ticker.modelGreeks and ticker.modelGreeks.optPrice:
-        print(f"      Using model: {ticker.modelGreeks.optPrice}")
-        return ticker.modelGreeks.optPrice
+    price, source = None, None
+    if _positive(ticker.last):
+        price, source = ticker.last, 'last'
+    elif _positive(ticker.bid) and _positive(ticker.ask):
+        price, source = (ticker.bid + ticker.ask) / 2, 'mid'
+    elif _positive(ticker.close):
+        price, source = ticker.close, 'close'
+    elif use_model and ticker.modelGreeks and ticker.modelGreeks.optPrice:
+        price, source = ticker.modelGreeks.optPrice, 'model'
     
-    return None
+    if DEBUG and price is not None:
+        print(f"      Using {source}: {price}")
+    return price
+
+
+def get_option_price(ticker):
+    """Get current option price from ticker, prefer last price, fall back to mid."""
+    return _ticker_price(ticker, use_model=True)
 
 
 def get_stock_price(ticker):
     """Get current stock price from ticker."""
-    import math
-    if ticker.last and not math.isnan(ticker.last) and ticker.last > 0:
-        return ticker.last
-    elif ticker.bid and ticker.ask and not math.isnan(ticker.bid) and not math.isnan(ticker.ask):
-        return (ticker.bid + ticker.ask) / 2
-    elif ticker.close and not math.isnan(ticker.close) and ticker.close > 0:
-        return ticker.close
-    return None
+    return _ticker_price(ticker)
+
+
+def _price_line(entry, current, pnl):
+    """'Entry: $x | Current: $y | P&L: $z' summary shared by every leg printout."""
+    return f"Entry: ${entry:.2f} | Current: ${current:.2f} | P&L: ${pnl:.2f}"
 
 
 def format_date(ib_date_str):
     """Convert IB date format (YYYYMMDD) to ISO format (YYYY-MM-DD)."""
-    try:
-        dt = datetime.strptime(ib_date_str, '%Y%m%d')
-        return dt.strftime('%Y-%m-%d')
-    except:
-        return ib_date_str
+    # Fixed-width digits: slicing is enough, no strptime/strftime round-trip
+    s = ib_date_str
+    if isinstance(s, str) and len(s) == 8 and s.isdigit():
+        return f"{s[:4]}-{s[4:6]}-{s[6:8]}"
+    return ib_date_str
 
 
 def export_to_json(calendar_spreads, filename='trades.json'):
@@ -292,31 +444,61 @@ def export_to_json(calendar_spreads, filename='trades.json'):
     """
     print(f"\n[INFO] Exporting {len(calendar_spreads)} calendar spreads to {filename}...")
     
-    trades = []
+    _write_json_list(filename, _calendar_trades(calendar_spreads))
     
-    for _, spread in enumerate(calendar_spreads):
-        # Calculate entry prices per share
-        # IB avgCost is in cents PER CONTRACT, so just divide by 100 to get dollars
-        front_entry = abs(spread['front']['avgCost']) / 100
-        back_entry = abs(spread['back']['avgCost']) / 100
-        
-        front_current = spread['front']['currentPrice']
-        back_current = spread['back']['currentPrice']
-        
-        # Calendar spread P&L calculation:
-        # Entry net debit = Back Entry - Front Entry (you pay this to enter)
-        # Current spread value = Back Current - Front Current
-        # P&L = (Current spread - Entry debit) * quantity * 100
-        entry_debit = back_entry - front_entry
-        current_spread = back_current - front_current
-        total_unrealized_pnl = (current_spread - entry_debit) * spread['quantity'] * 100
-        
-        # Individual leg P&L (for display purposes)
-        # Short front: profit when it goes down
-        front_pnl = (front_entry - front_current) * spread['quantity'] * 100
-        # Long back: profit when it goes up
-        back_pnl = (back_current - back_entry) * spread['quantity'] * 100
-        
+    print(f"\n[OK] Exported to {filename}")
+    print(f"\n[INSTRUCTIONS] To import into Trade Tracker:")
+    print(f"   1. Copy {filename} content")
+    print(f"   2. Go to Trade Tracker page")
+    print(f"   3. Click 'Import from JSON' button")
+    print(f"   4. Paste and import")
+    
+    return filename
+
+
+def _calendar_trades(calendar_spreads):
+    """Yield Trade Tracker dicts for each calendar spread (printing a summary as it goes)."""
+    # One timestamp/date for the whole export
+    entry_date = date.today().strftime('%Y-%m-%d')
+    as_of = datetime.now().isoformat()
+    
+    n = len(calendar_spreads)
+    if not n:
+        return
+    
+    # P&L for all spreads at once, one array per field
+    def column(values):
+        return np.fromiter(values, dtype=float, count=n)
+    
+    # Per-share entry prices were derived from IB avgCost when the spread was built
+    front_entry = column(s['front']['entryPrice'] for s in calendar_spreads)
+    back_entry = column(s['back']['entryPrice'] for s in calendar_spreads)
+    front_current = column(s['front']['currentPrice'] for s in calendar_spreads)
+    back_current = column(s['back']['currentPrice'] for s in calendar_spreads)
+    quantity = column(s['quantity'] for s in calendar_spreads)
+    
+    # Calendar spread P&L calculation:
+    # Entry net debit = Back Entry - Front Entry (you pay this to enter)
+    # Current spread value = Back Current - Front Current
+    # P&L = (Current spread - Entry debit) * quantity * 100
+    entry_debit = back_entry - front_entry
+    current_spread = back_current - front_current
+    total_unrealized_pnl = (current_spread - entry_debit) * quantity * 100
+    
+    # Individual leg P&L (for display purposes)
+    # Short front: profit when it goes down
+    front_pnl = (front_entry - front_current) * quantity * 100
+    # Long back: profit when it goes up
+    back_pnl = (back_current - back_entry) * quantity * 100
+    
+    rows = zip(
+        calendar_spreads,
+        front_entry.tolist(), back_entry.tolist(), front_current.tolist(), back_current.tolist(),
+        entry_debit.tolist(), current_spread.tolist(), total_unrealized_pnl.tolist(),
+        front_pnl.tolist(), back_pnl.tolist(),
+    )
+    for (spread, front_entry, back_entry, front_current, back_current,
+         entry_debit, current_spread, total_unrealized_pnl, front_pnl, back_pnl) in rows:
         # Stable ID so the web UI can update/replace the same position across runs.
         # (If you change strikes/expiries/rights, this naturally becomes a new trade.)
         stable_id = f"ibcal_{spread['symbol']}_{spread['right']}_{float(spread['strike'])}_{spread['front']['contract'].lastTradeDateOrContractMonth}_{spread['back']['contract'].lastTradeDateOrContractMonth}"
@@ -338,31 +520,36 @@ def export_to_json(calendar_spreads, filename='trades.json'):
             'backUnrealizedPnL': round(back_pnl, 2),
             'underlyingEntryPrice': round(spread['underlying']['currentPrice'], 2),  # Using current as we don't have historical
             'underlyingCurrentPrice': round(spread['underlying']['currentPrice'], 2),
-            'entryDate': date.today().strftime('%Y-%m-%d'),
+            'entryDate': entry_date,
             'unrealizedPnL': round(total_unrealized_pnl, 2),
             'status': 'open',
-            'asOf': datetime.now().isoformat(),
+            'asOf': as_of,
         }
         
-        trades.append(trade)
-        
         print(f"  {trade['quantity']}x {trade['symbol']} ${trade['strike']} {trade['callOrPut']}")
-        print(f"    Front: {trade['frontExpiration']} | Entry: ${front_entry:.2f} | Current: ${front_current:.2f} | P&L: ${front_pnl:.2f}")
-        print(f"    Back:  {trade['backExpiration']} | Entry: ${back_entry:.2f} | Current: ${back_current:.2f} | P&L: ${back_pnl:.2f}")
+        print(f"    Front: {trade['frontExpiration']} | {_price_line(front_entry, front_current, front_pnl)}")
+        print(f"    Back:  {trade['backExpiration']} | {_price_line(back_entry, back_current, back_pnl)}")
         print(f"    Spread: Entry: ${entry_debit:.2f} | Current: ${current_spread:.2f} | Total P&L: ${total_unrealized_pnl:.2f}")
+        
+        yield trade
+
+
+def _write_json_list(filename, items):
+    """
+    Write items as a JSON array one element at a time (same layout as json.dump(indent=2)).
     
-    # Write to JSON file
-    with open(filename, 'w') as f:
-        json.dump(trades, f, indent=2)
-    
-    print(f"\n[OK] Exported to {filename}")
-    print(f"\n[INSTRUCTIONS] To import into Trade Tracker:")
-    print(f"   1. Copy {filename} content")
-    print(f"   2. Go to Trade Tracker page")
-    print(f"   3. Click 'Import from JSON' button")
-    print(f"   4. Paste and import")
-    
-    return filename
+    Goes through a temp file so readers never see a half-written export.
+    """
+    tmp = f"{filename}.tmp"
+    with open(tmp, 'w') as f:
+        f.write('[')
+        count = 0
+        for item in items:
+            f.write(',\n  ' if count else '\n  ')
+            f.write(json.dumps(item, indent=2).replace('\n', '\n  '))
+            count += 1
+        f.write('\n]' if count else ']')
+    os.replace(tmp, filename)
 
 
 def identify_directional_trades(option_positions, calendar_spreads, ib):
@@ -380,24 +567,23 @@ def identify_directional_trades(option_positions, calendar_spreads, ib):
         cal_conIds.add(spread['front']['contract'].conId)
         cal_conIds.add(spread['back']['contract'].conId)
 
-    directional = []
-    for pos in option_positions:
-        contract = pos['contract']
-        if contract.conId in cal_conIds:
-            continue  # skip legs that belong to a calendar spread
+    # skip legs that belong to a calendar spread
+    singles = [pos for pos in option_positions if pos['contract'].conId not in cal_conIds]
 
-        # Request market data
-        ib.qualifyContracts(contract)
-        ticker = ib.reqMktData(contract, '', False, False)
-        ib.sleep(2)
+    directional = []
+    if not singles:
+        print("  [INFO] No single-leg option positions found")
+        return directional
 
-        underlying = Stock(contract.symbol, 'SMART', 'USD')
-        ib.qualifyContracts(underlying)
-        underlying_ticker = ib.reqMktData(underlying, '', False, False)
-        ib.sleep(2)
+    # Snapshot every leg and underlying together, then wait once for all quotes
+    option_contracts, underlyings = snapshot_quotes(ib, (pos['contract'] for pos in singles))
+    tickers = _ticker_cache
 
-        current_price = get_option_price(ticker)
-        underlying_price = get_stock_price(underlying_ticker)
+    entry_date = date.today().strftime('%Y-%m-%d')
+    as_of = datetime.now().isoformat()
+    for pos, contract in zip(singles, option_contracts):
+        current_price = get_option_price(tickers[contract.conId])
+        underlying_price = get_stock_price(tickers[underlyings[contract.symbol].conId])
 
         if current_price is None or underlying_price is None:
             print(f"  [WARN] Skipping {contract.symbol} ${contract.strike} {contract.right} - no market data")
@@ -427,16 +613,16 @@ def identify_directional_trades(option_positions, calendar_spreads, ib):
             'currentPrice': round(current_price, 2),
             'underlyingEntryPrice': round(underlying_price, 2),
             'underlyingCurrentPrice': round(underlying_price, 2),
-            'entryDate': date.today().strftime('%Y-%m-%d'),
+            'entryDate': entry_date,
             'unrealizedPnL': round(unrealized_pnl, 2),
             'status': 'open',
-            'asOf': datetime.now().isoformat(),
+            'asOf': as_of,
         }
         directional.append(trade)
 
         direction = "Long" if is_long else "Short"
         print(f"  [+] {direction} {qty}x {contract.symbol} ${contract.strike} {contract.right} exp {format_date(contract.lastTradeDateOrContractMonth)}")
-        print(f"      Entry: ${entry_price:.2f} | Current: ${current_price:.2f} | P&L: ${unrealized_pnl:.2f}")
+        print(f"      {_price_line(entry_price, current_price, unrealized_pnl)}")
 
     if not directional:
         print("  [INFO] No single-leg option positions found")
@@ -447,8 +633,7 @@ def identify_directional_trades(option_positions, calendar_spreads, ib):
 def export_directional_trades(trades, filename='directional_trades.json'):
     """Export directional (single-leg) option trades to JSON."""
     print(f"\n[INFO] Exporting {len(trades)} directional trades to {filename}...")
-    with open(filename, 'w') as f:
-        json.dump(trades, f, indent=2)
+    _write_json_list(filename, trades)
     print(f"[OK] Exported to {filename}")
     return filename
 
@@ -478,6 +663,9 @@ def main():
             export_directional_trades([], filename='directional_trades.json')
             return
         
+        # Quote every position and underlying in one wave; both passes below read from it
+        snapshot_quotes(ib, (pos['contract'] for pos in option_positions))
+        
         # Identify calendar spreads
         calendar_spreads = identify_calendar_spreads(option_positions, ib)
         
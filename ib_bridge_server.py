@@ -28,17 +28,21 @@ Notes
 
 from __future__ import annotations
 
+import hashlib
 import json
 import os
 import threading
 import time
-from dataclasses import asdict, dataclass
+from dataclasses import dataclass
 from datetime import date, datetime, timedelta
-from http.server import BaseHTTPRequestHandler, HTTPServer
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from typing import Any, Dict, List, Optional, Tuple
 from urllib.parse import urlparse, parse_qs
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Load environment variables from .env files
 def _load_env_file(path):
@@ -89,6 +93,18 @@ try:
 except Exception:
     EARNINGS_CHECKER_AVAILABLE = False
 
+try:
+    from zoneinfo import ZoneInfo
+    _MARKET_TZ = ZoneInfo("America/New_York")
+except Exception:
+    _MARKET_TZ = None  # no tz database (e.g. Windows without tzdata)
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 try:
     import yfinance as yf
     YFINANCE_AVAILABLE = True
@@ -116,12 +132,27 @@ IB_PORTS = [
 ]
 IB_CLIENT_ID = int(os.environ.get("IB_CLIENT_ID", "1101"))
 
-# Market data pacing: keep conservative
+# Max time to wait for live marks on a refresh (all legs are quoted together)
 MKT_DATA_SLEEP_SECONDS = float(os.environ.get("IB_BRIDGE_MKT_SLEEP", "1.5"))
 
-# How often to refresh IB snapshot (seconds)
+# How often to rescan positions from IB (seconds); marks stream in between
 REFRESH_SECONDS = float(os.environ.get("IB_BRIDGE_REFRESH_SECONDS", "15"))
 
+# Rescan interval outside US options hours (weekdays 09:30-16:15 ET)
+OFF_HOURS_REFRESH_SECONDS = float(os.environ.get("IB_BRIDGE_OFF_HOURS_REFRESH_SECONDS", "600"))
+
+# Minimum spacing between snapshot rebuilds driven by streaming ticks
+MARKS_PUBLISH_SECONDS = float(os.environ.get("IB_BRIDGE_MARKS_SECONDS", "1"))
+
+# HTTP handler threads (requests only read the snapshot or call quote APIs)
+HTTP_WORKERS = int(os.environ.get("IB_BRIDGE_HTTP_WORKERS", "8"))
+
+# How long a looked-up earnings date (or "none found") is reused in-process
+EARNINGS_TTL_SECONDS = float(os.environ.get("IB_BRIDGE_EARNINGS_TTL_SECONDS", str(6 * 3600)))
+
+# Earnings lookahead for open straddles
+EARNINGS_DAYS_AHEAD = 120
+
 
 def _ensure_event_loop_in_this_thread() -> None:
     """Create/set an asyncio loop for the current thread."""
@@ -133,11 +164,40 @@ def _ensure_event_loop_in_this_thread() -> None:
         asyncio.set_event_loop(asyncio.new_event_loop())
 
 
+def _current_refresh_seconds() -> float:
+    """REFRESH_SECONDS while US options trade, OFF_HOURS_REFRESH_SECONDS otherwise."""
+    if _MARKET_TZ is None:
+        return REFRESH_SECONDS
+    now = datetime.now(_MARKET_TZ)
+    minutes = now.hour * 60 + now.minute
+    if now.weekday() < 5 and 9 * 60 + 30 <= minutes < 16 * 60 + 15:
+        return REFRESH_SECONDS
+    return max(REFRESH_SECONDS, OFF_HOURS_REFRESH_SECONDS)
+
+
 def _finnhub_key() -> str:
     return (os.environ.get("FINNHUB_API_KEY") or "").strip()
 
 
-_earnings_checker = EarningsChecker(use_yahoo_fallback=True) if EARNINGS_CHECKER_AVAILABLE else None
+# Built on first lookup (on the worker thread) so the HTTP server binds
+# without waiting on EarningsChecker's cache loading.
+_earnings_checker: Optional["EarningsChecker"] = None
+_earnings_checker_lock = threading.Lock()
+
+
+def _get_earnings_checker() -> Optional["EarningsChecker"]:
+    global _earnings_checker
+    if _earnings_checker is None and EARNINGS_CHECKER_AVAILABLE:
+        with _earnings_checker_lock:
+            if _earnings_checker is None:
+                _earnings_checker = EarningsChecker(use_yahoo_fallback=True)
+    return _earnings_checker
+
+
+_earnings_cache: Dict[Tuple[str, int], Tuple[float, Optional[str]]] = {}
+# Runs batch earnings lookups off the IB worker thread, which owns the IB
+# event loop (EarningsChecker.check_batch starts its own loop).
+_earnings_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ib_bridge_earnings")
 
 
 def fetch_yahoo_quotes(symbols: List[str]) -> Dict[str, Any]:
@@ -211,6 +271,16 @@ def fetch_yahoo_quotes(symbols: List[str]) -> Dict[str, Any]:
         return {"ok": False, "error": str(e)}
 
 
+# Keep-alive session shared by the HTTP handler threads for Finnhub quotes
+# (EarningsChecker keeps its own for earnings lookups).
+_http = requests.Session()
+_http.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=HTTP_WORKERS,
+    max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504]),
+))
+
+
 def fetch_finnhub_quotes(symbols: List[str]) -> Dict[str, Any]:
     """Fetch live quotes from Finnhub API (supports after-hours)."""
     api_key = _finnhub_key()
@@ -223,15 +293,16 @@ def fetch_finnhub_quotes(symbols: List[str]) -> Dict[str, Any]:
     quotes = {}
     
     try:
-        import urllib.request
-        
         for symbol in symbols:
             try:
-                url = f"https://finnhub.io/api/v1/quote?symbol={symbol.upper()}&token={api_key}"
-                req = urllib.request.Request(url, headers={"User-Agent": "Mozilla/5.0"})
-                
-                with urllib.request.urlopen(req, timeout=10) as resp:
-                    data = json.loads(resp.read().decode("utf-8"))
+                resp = _http.get(
+                    "https://finnhub.io/api/v1/quote",
+                    params={"symbol": symbol.upper(), "token": api_key},
+                    headers={"User-Agent": "Mozilla/5.0"},
+                    timeout=10,
+                )
+                resp.raise_for_status()
+                data = resp.json()
                 
                 # Finnhub returns: c=current, d=change, dp=changePercent, h=high, l=low, o=open, pc=prevClose, t=timestamp
                 current = data.get("c")
@@ -270,27 +341,76 @@ def fetch_finnhub_quotes(symbols: List[str]) -> Dict[str, Any]:
         return {"ok": False, "error": str(e)}
 
 
-def _json_response(handler: BaseHTTPRequestHandler, status: int, payload: Any) -> None:
-    body = json.dumps(payload, indent=2, default=str).encode("utf-8")
+def _encode_json(payload: Any) -> bytes:
+    # Compact output: the UI parses it, and indent=2 forces json's slow path.
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(payload, default=str, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(payload, default=str, separators=(",", ":")).encode("utf-8")
+
+
+def _json_response(
+    handler: BaseHTTPRequestHandler,
+    status: int,
+    payload: Any = None,
+    body: Optional[bytes] = None,
+    etag: Optional[str] = None,
+) -> None:
+    """Send a JSON response; pass ``body`` to reuse already-encoded bytes."""
+    if body is None:
+        body = _encode_json(payload)
     handler.send_response(status)
     handler.send_header("Content-Type", "application/json; charset=utf-8")
     # Basic CORS for local dev
     handler.send_header("Access-Control-Allow-Origin", "*")
     handler.send_header("Access-Control-Allow-Methods", "GET, OPTIONS")
     handler.send_header("Access-Control-Allow-Headers", "Content-Type")
+    if etag:
+        handler.send_header("ETag", etag)
     handler.send_header("Content-Length", str(len(body)))
     handler.end_headers()
     handler.wfile.write(body)
 
 
+def _not_modified(handler: BaseHTTPRequestHandler, etag: str) -> None:
+    handler.send_response(304)
+    handler.send_header("ETag", etag)
+    handler.send_header("Access-Control-Allow-Origin", "*")
+    handler.end_headers()
+
+
 def fetch_next_earnings_date(symbol: str, days_ahead: int = 60) -> Optional[str]:
-    if not _earnings_checker:
-        return None
-    # EarningsChecker caches (including negative results) in a shared file cache.
-    dt = _earnings_checker.get_earnings_date(symbol, days_ahead=days_ahead)
-    if not dt:
+    checker = _get_earnings_checker()
+    if not checker:
         return None
-    return dt.strftime("%Y-%m-%d")
+    # EarningsChecker caches (including negative results) in a shared file cache;
+    # this in-process layer keeps the refresh loop from touching it every cycle.
+    key = (symbol, days_ahead)
+    hit = _earnings_cache.get(key)
+    now = time.time()
+    if hit is not None and now - hit[0] < EARNINGS_TTL_SECONDS:
+        return hit[1]
+    dt = checker.get_earnings_date(symbol, days_ahead=days_ahead)
+    value = dt.strftime("%Y-%m-%d") if dt else None
+    _earnings_cache[key] = (now, value)
+    return value
+
+
+def prefetch_next_earnings_dates(symbols: List[str], days_ahead: int = 60) -> None:
+    """Warm the TTL cache for every stale symbol with one concurrent batch lookup."""
+    checker = _get_earnings_checker()
+    if not checker:
+        return
+    now = time.time()
+    stale = [
+        s for s in dict.fromkeys(symbols)
+        if now - _earnings_cache.get((s, days_ahead), (0.0, None))[0] >= EARNINGS_TTL_SECONDS
+    ]
+    if not stale:
+        return
+    found = checker.check_batch(stale, days_ahead=days_ahead)
+    for s in stale:
+        dt = found.get(s)
+        _earnings_cache[(s, days_ahead)] = (now, dt.strftime("%Y-%m-%d") if dt else None)
 
 
 def days_to(date_str: Optional[str]) -> Optional[int]:
@@ -341,10 +461,43 @@ class OpenStraddle:
     unrealized_pnl: Optional[float]
     unrealized_pnl_pct: Optional[float]
 
+    def to_dict(self) -> Dict[str, Any]:
+        # Shallow on purpose: call/put are built fresh per payload and never mutated.
+        return {
+            "ticker": self.ticker,
+            "expiry": self.expiry,
+            "strike": self.strike,
+            "quantity": self.quantity,
+            "earnings_date": self.earnings_date,
+            "days_to_earnings": self.days_to_earnings,
+            "action_needed": self.action_needed,
+            "call": self.call,
+            "put": self.put,
+            "straddle_mid": self.straddle_mid,
+            "cost_basis_per_straddle": self.cost_basis_per_straddle,
+            "unrealized_pnl": self.unrealized_pnl,
+            "unrealized_pnl_pct": self.unrealized_pnl_pct,
+        }
+
+
+def _leg_key(c: Contract) -> Tuple[str, str, float, str]:
+    return (c.symbol, c.lastTradeDateOrContractMonth, float(c.strike or 0), c.right)
+
 
 class IBClient:
     def __init__(self) -> None:
         self._ib = IB()
+        # (symbol, expiry, strike, right) -> qualified contract; legs only need
+        # one TWS round-trip for the lifetime of the process.
+        self._qualified: Dict[Tuple[str, str, float, str], Contract] = {}
+        # Streaming tickers for held legs, same key as _qualified
+        self._tickers: Dict[Tuple[str, str, float, str], Any] = {}
+        self._pairs: List[Tuple[Tuple[str, str, float], Dict[str, Any], Dict[str, Any]]] = []
+        self._port: Optional[int] = None
+        self._marks_dirty = False
+        self._positions_dirty = True
+        self._ib.pendingTickersEvent += self._on_pending_tickers
+        self._ib.positionEvent += self._on_position
 
     def connect(self) -> Tuple[bool, Optional[int], Optional[str]]:
         if not IB_AVAILABLE:
@@ -353,14 +506,16 @@ class IBClient:
         if self._ib.isConnected():
             return True, self._ib.client.port, None
 
+        # Subscriptions do not survive a dropped connection
+        self._tickers.clear()
+        last_err: Optional[str] = None
         for port in IB_PORTS:
             try:
                 self._ib.connect(IB_HOST, port, clientId=IB_CLIENT_ID)
                 return True, port, None
             except Exception as e:
                 last_err = str(e)
-                continue
-        return False, None, last_err if 'last_err' in locals() else "Could not connect"
+        return False, None, last_err or "Could not connect"
 
     def disconnect(self) -> None:
         try:
@@ -368,11 +523,8 @@ class IBClient:
         except Exception:
             pass
 
-    def _get_quote(self, contract: Contract) -> StraddleLegQuote:
-        self._ib.qualifyContracts(contract)
-        tkr = self._ib.reqMktData(contract, "", False, False)
-        self._ib.sleep(MKT_DATA_SLEEP_SECONDS)
-
+    @staticmethod
+    def _leg_quote(tkr) -> StraddleLegQuote:
         bid = tkr.bid if tkr.bid and tkr.bid > 0 else None
         ask = tkr.ask if tkr.ask and tkr.ask > 0 else None
         last = tkr.last if tkr.last and tkr.last > 0 else None
@@ -388,13 +540,77 @@ class IBClient:
         else:
             mid = None
 
-        try:
-            self._ib.cancelMktData(contract)
-        except Exception:
-            pass
-
         return StraddleLegQuote(bid=bid, ask=ask, last=last, mid=mid)
 
+    def _qualify_cached(self, contracts: List[Contract]) -> List[Contract]:
+        keys = [_leg_key(c) for c in contracts]
+        missing = {k: c for k, c in zip(keys, contracts) if k not in self._qualified}
+        if missing:
+            fresh = list(missing.values())
+            self._ib.qualifyContracts(*fresh)
+            for k, c in zip(missing, fresh):
+                if getattr(c, "conId", 0):
+                    self._qualified[k] = c
+        return [self._qualified.get(k, c) for k, c in zip(keys, contracts)]
+
+    def _subscribe(self, contracts: List[Contract]) -> List[Any]:
+        """Return one streaming ticker per contract.
+
+        Legs already streaming are reused and legs no longer held are
+        cancelled. New legs are subscribed in one wave, and we wait on ticker
+        updates until they have a two-sided market (or MKT_DATA_SLEEP_SECONDS
+        elapses).
+        """
+        contracts = self._qualify_cached(contracts)
+        keys = [_leg_key(c) for c in contracts]
+
+        held = set(keys)
+        for k in [k for k in self._tickers if k not in held]:
+            try:
+                self._ib.cancelMktData(self._tickers.pop(k).contract)
+            except Exception:
+                pass
+
+        fresh = []
+        for k, c in zip(keys, contracts):
+            if k not in self._tickers:
+                self._tickers[k] = self._ib.reqMktData(c, "", False, False)
+                fresh.append(self._tickers[k])
+
+        deadline = time.monotonic() + MKT_DATA_SLEEP_SECONDS
+        while not all(t.bid and t.bid > 0 and t.ask and t.ask > 0 for t in fresh):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            self._ib.waitOnUpdate(timeout=min(remaining, 0.2))
+
+        return [self._tickers[k] for k in keys]
+
+    def _on_pending_tickers(self, tickers) -> None:
+        self._marks_dirty = True
+
+    def _on_position(self, position) -> None:
+        self._positions_dirty = True
+
+    @property
+    def positions_changed(self) -> bool:
+        return self._positions_dirty
+
+    def wait_for_update(self, timeout: float, min_interval: float) -> bool:
+        """Pump IB events until a held leg ticks, positions change, or timeout.
+
+        Waits at least ``min_interval`` so a busy tape is republished at a
+        bounded rate. Returns True if marks changed.
+        """
+        deadline = time.monotonic() + max(0.0, timeout)
+        self._ib.sleep(min(min_interval, max(0.0, timeout)))
+        while not (self._marks_dirty or self._positions_dirty):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            self._ib.waitOnUpdate(timeout=remaining)
+        return self._marks_dirty
+
     def get_open_preearnings_straddles(self) -> Dict[str, Any]:
         ok, port, err = self.connect()
         if not ok:
@@ -443,21 +659,48 @@ class IBClient:
                 "avgCost": float(getattr(p, "avgCost", 0) or 0),
             }
 
-        open_straddles: List[OpenStraddle] = []
+        pairs = [
+            (key, legs["C"], legs["P"])
+            for key, legs in grouped.items()
+            if legs.get("C") and legs.get("P")
+        ]
 
-        for (symbol, expiry, strike), legs in grouped.items():
-            call_leg = legs.get("C")
-            put_leg = legs.get("P")
-            if not call_leg or not put_leg:
-                continue
+        # Earnings lookups for new symbols overlap the market-data wait below
+        earnings = _earnings_pool.submit(
+            prefetch_next_earnings_dates, [key[0] for key, _, _ in pairs], EARNINGS_DAYS_AHEAD
+        )
+
+        # Live marks: one streaming subscription per leg, kept across refreshes
+        tickers = self._subscribe(
+            [leg["contract"] for _, call_leg, put_leg in pairs for leg in (call_leg, put_leg)]
+        )
 
+        try:
+            earnings.result()
+        except Exception as e:
+            print(f"  [WARN] Earnings prefetch failed: {e}")
+        for i, (_, call_leg, put_leg) in enumerate(pairs):
+            call_leg["ticker"] = tickers[2 * i]
+            put_leg["ticker"] = tickers[2 * i + 1]
+
+        self._pairs = pairs
+        self._port = port
+        self._positions_dirty = False
+        return self.current_payload()
+
+    def current_payload(self) -> Dict[str, Any]:
+        """Rebuild the straddle payload from held legs and their live tickers."""
+        self._marks_dirty = False
+
+        open_straddles: List[OpenStraddle] = []
+
+        for (symbol, expiry, strike), call_leg, put_leg in self._pairs:
             qty = min(int(call_leg["quantity"]), int(put_leg["quantity"]))
             if qty <= 0:
                 continue
 
-            # Live marks
-            call_quote = self._get_quote(call_leg["contract"])
-            put_quote = self._get_quote(put_leg["contract"])
+            call_quote = self._leg_quote(call_leg["ticker"])
+            put_quote = self._leg_quote(put_leg["ticker"])
 
             straddle_mid = None
             if call_quote.mid is not None and put_quote.mid is not None:
@@ -474,15 +717,13 @@ class IBClient:
                     unrealized_pnl_pct = unrealized_pnl / denom * 100.0
 
             # Earnings + action
-            earnings_date = fetch_next_earnings_date(symbol, days_ahead=120)
+            earnings_date = fetch_next_earnings_date(symbol, days_ahead=EARNINGS_DAYS_AHEAD)
             dte = days_to(earnings_date)
 
             open_straddles.append(
                 OpenStraddle(
                     ticker=symbol,
-                    expiry=datetime.strptime(expiry, "%Y%m%d").strftime("%Y-%m-%d")
-                    if len(expiry) == 8
-                    else expiry,
+                    expiry=f"{expiry[:4]}-{expiry[4:6]}-{expiry[6:8]}" if len(expiry) == 8 else expiry,
                     strike=float(strike),
                     quantity=int(qty),
                     earnings_date=earnings_date,
@@ -517,27 +758,35 @@ class IBClient:
 
         return {
             "ok": True,
-            "ib_port": port,
+            "ib_port": self._port,
             "asof": datetime.now().isoformat(),
-            "open_straddles": [asdict(x) for x in open_straddles],
+            "open_straddles": [x.to_dict() for x in open_straddles],
         }
 
 
 _ib_client = IBClient()
 
 _snapshot_lock = threading.Lock()
-_snapshot: Dict[str, Any] = {
-    "ok": False,
-    "error": "starting",
-    "asof": datetime.now().isoformat(),
-    "open_straddles": [],
-}
+_snapshot: Dict[str, Any] = {}
+# The snapshot only changes once per refresh, so it is encoded once there and
+# every GET just writes these bytes.
+_snapshot_bytes: bytes = b""
+_snapshot_etag: str = ""
+# (ok, ib_port, error, asof) for /api/health; swapped as one tuple
+_health: Tuple[bool, Optional[int], Optional[str], Optional[str]] = (False, None, "starting", None)
 
 
 def _set_snapshot(payload: Dict[str, Any]) -> None:
+    global _snapshot_bytes, _snapshot_etag, _health
+    body = _encode_json(payload)
+    etag = '"' + hashlib.md5(body).hexdigest() + '"'
+    health = (bool(payload.get("ok")), payload.get("ib_port"), payload.get("error"), payload.get("asof"))
     with _snapshot_lock:
         _snapshot.clear()
         _snapshot.update(payload)
+        _snapshot_bytes = body
+        _snapshot_etag = etag
+        _health = health
 
 
 def _get_snapshot() -> Dict[str, Any]:
@@ -545,6 +794,19 @@ def _get_snapshot() -> Dict[str, Any]:
         return dict(_snapshot)
 
 
+def _get_snapshot_bytes() -> Tuple[bool, bytes, str]:
+    with _snapshot_lock:
+        return bool(_snapshot.get("ok")), _snapshot_bytes, _snapshot_etag
+
+
+_set_snapshot({
+    "ok": False,
+    "error": "starting",
+    "asof": datetime.now().isoformat(),
+    "open_straddles": [],
+})
+
+
 def _snapshot_worker() -> None:
     """Background worker: all IB calls run here (single thread + its loop)."""
     if not IB_AVAILABLE:
@@ -553,16 +815,33 @@ def _snapshot_worker() -> None:
 
     _ensure_event_loop_in_this_thread()
 
+    # Full rescans (positions, qualification, subscriptions) run every
+    # _current_refresh_seconds() or when IB reports a position change; in
+    # between, the snapshot is rebuilt from streaming ticks as they arrive.
+    next_full = 0.0
     while True:
         try:
-            payload = _ib_client.get_open_preearnings_straddles()
+            if time.monotonic() >= next_full or _ib_client.positions_changed:
+                payload = _ib_client.get_open_preearnings_straddles()
+                next_full = time.monotonic() + _current_refresh_seconds()
+            else:
+                payload = _ib_client.current_payload()
             if "asof" not in payload:
                 payload["asof"] = datetime.now().isoformat()
             _set_snapshot(payload)
+            ok = bool(payload.get("ok"))
         except Exception as e:
             _set_snapshot({"ok": False, "error": str(e), "asof": datetime.now().isoformat(), "open_straddles": []})
+            next_full = time.monotonic() + _current_refresh_seconds()
+            ok = False
 
-        time.sleep(REFRESH_SECONDS)
+        if not ok:
+            time.sleep(max(0.0, next_full - time.monotonic()))
+            continue
+        try:
+            _ib_client.wait_for_update(next_full - time.monotonic(), MARKS_PUBLISH_SECONDS)
+        except Exception:
+            next_full = 0.0
 
 
 class Handler(BaseHTTPRequestHandler):
@@ -574,23 +853,26 @@ class Handler(BaseHTTPRequestHandler):
         path = parsed.path
 
         if path == "/api/health":
-            snap = _get_snapshot()
+            ok, ib_port, error, asof = _health
             _json_response(
                 self,
                 200,
                 {
-                    "ok": bool(snap.get("ok")),
-                    "ib_connected": bool(snap.get("ok")),
-                    "ib_port": snap.get("ib_port"),
-                    "error": snap.get("error"),
-                    "asof": snap.get("asof"),
+                    "ok": ok,
+                    "ib_connected": ok,
+                    "ib_port": ib_port,
+                    "error": error,
+                    "asof": asof,
                 },
             )
             return
 
         if path == "/api/preearnings/open":
-            payload = _get_snapshot()
-            _json_response(self, 200 if payload.get("ok") else 503, payload)
+            ok, body, etag = _get_snapshot_bytes()
+            if ok and self.headers.get("If-None-Match") == etag:
+                _not_modified(self, etag)
+                return
+            _json_response(self, 200 if ok else 503, body=body, etag=etag)
             return
 
         # Live quotes endpoint: /api/quotes?symbols=GOOGL,QCOM
@@ -632,6 +914,23 @@ class Handler(BaseHTTPRequestHandler):
         return
 
 
+class BridgeHTTPServer(ThreadingHTTPServer):
+    """Threaded server backed by a fixed pool instead of a thread per request."""
+
+    daemon_threads = True
+
+    def __init__(self, server_address, handler_class, max_workers: int = HTTP_WORKERS) -> None:
+        super().__init__(server_address, handler_class)
+        self._pool = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="ib_bridge_http")
+
+    def process_request(self, request, client_address) -> None:
+        self._pool.submit(self.process_request_thread, request, client_address)
+
+    def server_close(self) -> None:
+        super().server_close()
+        self._pool.shutdown(wait=False)
+
+
 def main() -> int:
     if not IB_AVAILABLE:
         print("ERROR: ib_insync not installed in this environment")
@@ -641,7 +940,7 @@ def main() -> int:
     t = threading.Thread(target=_snapshot_worker, name="ib_snapshot_worker", daemon=True)
     t.start()
 
-    httpd = HTTPServer((HOST, PORT), Handler)
+    httpd = BridgeHTTPServer((HOST, PORT), Handler)
     print(f"IB Bridge listening on http://{HOST}:{PORT}")
     print("Endpoints:")
     print("  /api/health           - Server health check")
@@ -650,7 +949,7 @@ def main() -> int:
     print(f"IB ports tried: {IB_PORTS}")
     print(f"Finnhub API key: {'configured' if _finnhub_key() else 'NOT SET'}")
     print(f"yfinance fallback: {'available' if YFINANCE_AVAILABLE else 'not installed'}")
-    print(f"Refresh interval: {REFRESH_SECONDS}s")
+    print(f"Refresh interval: {REFRESH_SECONDS}s (off-hours: {max(REFRESH_SECONDS, OFF_HOURS_REFRESH_SECONDS)}s)")
 
     try:
         httpd.serve_forever()
@@ -0,0 +1,76 @@
+"""
+Shared IB connections for running several workflows in one process.
+
+IBScanner and CalendarOrderPlacer normally open (and tear down) their own
+connection. Pass them the same IBConnectionPool and they reuse one IB()
+instance instead, so a scan followed by order staging pays the connect
+handshake once and holds one of TWS's client slots.
+
+    with IBConnectionPool() as pool:
+        scan_iv_rankings('mag7', pool=pool)
+        placer = CalendarOrderPlacer(pool=pool)
+        placer.connect()
+        placer.place_orders_from_json('mag7_results_latest.json')
+"""
+
+import os
+
+from ib_insync import IB
+
+
+class IBConnectionPool:
+    """One IB() instance per client_id, shared by everyone holding the pool."""
+
+    def __init__(self, host=None, port=None, client_id=None):
+        """
+        Args:
+            host: IB Gateway/TWS host (default: IB_HOST or localhost)
+            port: API port (default: IB_PORT or 7498)
+            client_id: Client ID handed out by get() (default: IB_CLIENT_ID or 110)
+        """
+        if host is None:
+            host = os.environ.get('IB_HOST', '127.0.0.1')
+        if port is None:
+            port = int(os.environ.get('IB_PORT', '7498'))
+        if client_id is None:
+            client_id = int(os.environ.get('IB_CLIENT_ID', '110'))
+        self.host = host
+        self.port = port
+        self.client_id = client_id
+        self._ibs = {}
+
+    def get(self, client_id=None) -> IB:
+        """IB instance for client_id (the pool default if None); not necessarily connected."""
+        if client_id is None:
+            client_id = self.client_id
+        ib = self._ibs.get(client_id)
+        if ib is None:
+            ib = IB()
+            self._ibs[client_id] = ib
+        return ib
+
+    def connect(self, client_id=None, timeout=10) -> IB:
+        """Return a connected IB for client_id, connecting only if it isn't already."""
+        if client_id is None:
+            client_id = self.client_id
+        ib = self.get(client_id)
+        if not ib.isConnected():
+            ib.connect(self.host, self.port, clientId=client_id, timeout=timeout)
+        return ib
+
+    def close(self):
+        """Disconnect every pooled connection."""
+        for ib in self._ibs.values():
+            try:
+                if ib.isConnected():
+                    ib.disconnect()
+            except Exception:
+                pass
+        self._ibs.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
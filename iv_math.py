@@ -0,0 +1,88 @@
+"""
+Batch pricing math for option quotes: leg mids, calendar spread limits and
+estimated ATM calendar leg prices.
+
+Works on NumPy arrays covering every leg in a batch. When numba is installed
+the per-element loops are JIT-compiled; otherwise the same logic runs as
+NumPy array expressions.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Limit used when the quoted spread is zero or inverted
+MIN_SPREAD_LIMIT = 0.05
+
+# ATM option ~= 0.4 * S * sigma * sqrt(T) (Brenner-Subrahmanyam approximation)
+ATM_PRICE_FACTOR = 0.4
+
+
+if NUMBA_AVAILABLE:
+    # No fastmath: missing quotes are NaN and must compare False
+    @njit(cache=True)
+    def _mid_prices(bid, ask, last):
+        out = np.empty(bid.shape[0])
+        for i in range(bid.shape[0]):
+            if bid[i] > 0 and ask[i] > 0:
+                out[i] = (bid[i] + ask[i]) / 2
+            elif last[i] > 0:
+                out[i] = last[i]
+            else:
+                out[i] = 0.0
+        return out
+
+    @njit(cache=True)
+    def _spread_limits(front_mid, back_mid):
+        out = np.empty(front_mid.shape[0])
+        for i in range(front_mid.shape[0]):
+            debit = back_mid[i] - front_mid[i]
+            out[i] = np.floor(debit * 100 + 0.5) / 100 if debit > 0 else MIN_SPREAD_LIMIT
+        return out
+
+    @njit(cache=True, error_model='numpy')
+    def _calendar_prices(stock, front_iv, back_iv, front_dte, back_dte):
+        front = np.empty(stock.shape[0])
+        back = np.empty(stock.shape[0])
+        for i in range(stock.shape[0]):
+            front[i] = ATM_PRICE_FACTOR * stock[i] * front_iv[i] * np.sqrt(front_dte[i] / 365)
+            back[i] = ATM_PRICE_FACTOR * stock[i] * back_iv[i] * np.sqrt(back_dte[i] / 365)
+        return front, back
+else:
+    def _mid_prices(bid, ask, last):
+        two_sided = (bid > 0) & (ask > 0)
+        return np.where(two_sided, (bid + ask) / 2, np.where(last > 0, last, 0.0))
+
+    def _spread_limits(front_mid, back_mid):
+        debit = back_mid - front_mid
+        return np.where(debit > 0, np.floor(debit * 100 + 0.5) / 100, MIN_SPREAD_LIMIT)
+
+    def _calendar_prices(stock, front_iv, back_iv, front_dte, back_dte):
+        front = ATM_PRICE_FACTOR * stock * front_iv * np.sqrt(front_dte / 365)
+        back = ATM_PRICE_FACTOR * stock * back_iv * np.sqrt(back_dte / 365)
+        return front, back
+
+
+def _as_prices(values) -> np.ndarray:
+    # None/NaN quotes become NaN, which fails every "> 0" test above
+    return np.asarray(values, dtype=np.float64).reshape(-1)
+
+
+def mid_prices(bid, ask, last) -> np.ndarray:
+    """Bid/ask midpoint per leg, else last trade, else 0."""
+    return _mid_prices(_as_prices(bid), _as_prices(ask), _as_prices(last))
+
+
+def spread_limits(front_mid, back_mid) -> np.ndarray:
+    """Calendar debit (back - front) rounded half-up to cents, or MIN_SPREAD_LIMIT if not positive."""
+    return _spread_limits(_as_prices(front_mid), _as_prices(back_mid))
+
+
+def estimate_calendar_prices(stock, front_iv, back_iv, front_dte, back_dte):
+    """Estimated ATM (front, back) leg prices; IVs are decimals, DTEs in days."""
+    return _calendar_prices(_as_prices(stock), _as_prices(front_iv), _as_prices(back_iv),
+                            _as_prices(front_dte), _as_prices(back_dte))
@@ -3,7 +3,9 @@ Nasdaq 100 stock list
 Complete list as of 2025
 """
 
-NASDAQ_100 = [
+from universe_lists import MAG7 as _MAG7
+
+NASDAQ_100 = (
     # Top Technology & Communication Services
     'AAPL', 'MSFT', 'GOOGL', 'GOOG', 'AMZN', 'NVDA', 'META', 'TSLA', 'AVGO', 'NFLX',
     'AMD', 'ADBE', 'CSCO', 'CRM', 'INTC', 'QCOM', 'TXN', 'INTU', 'AMAT', 'ADI',
@@ -35,11 +37,17 @@ NASDAQ_100 = [
     
     # EV & New Tech
     'RIVN', 'LCID', 'PDD'
-]
+)
+
+NASDAQ100_SET = frozenset(NASDAQ_100)
 
 def get_nasdaq_100_list():
     """Return the complete Nasdaq 100 stock list."""
-    return NASDAQ_100
+    return list(NASDAQ_100)
+
+def is_nasdaq100(ticker):
+    """Return True if ticker is in the Nasdaq 100 list."""
+    return ticker in NASDAQ100_SET
 
 def get_tech_heavy_list():
     """Return a subset focused on high-volatility tech stocks."""
@@ -52,7 +60,7 @@ def get_tech_heavy_list():
 
 def get_mag7():
     """Return the 'Magnificent 7' mega-cap tech stocks."""
-    return ['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'NVDA', 'META', 'TSLA']
+    return list(_MAG7)
 
 
 if __name__ == "__main__":
@@ -12,6 +12,15 @@ import argparse
 import os
 from datetime import datetime, timedelta
 import time
+from pathlib import Path
+from dataclasses import dataclass
+from typing import Optional
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 try:
     from ib_insync import IB, Stock, Option, ComboLeg, Contract, LimitOrder
@@ -22,11 +31,61 @@ except ImportError:
     print("Install with: pip install ib_insync")
     sys.exit(1)
 
+from iv_math import mid_prices, spread_limits
+
+# Upper bound on waiting for option quotes (returns as soon as every leg is two-sided)
+MKT_DATA_TIMEOUT_SECONDS = 2.0
+# Legs quoted per wave; stays under TWS's default 100 simultaneous market data lines
+MKT_DATA_WAVE_SIZE = max(1, int(os.environ.get('MKT_DATA_WAVE_SIZE', '90')))
+# Upper bound on waiting for TWS to acknowledge a placed order
+ORDER_ACK_TIMEOUT_SECONDS = 1.0
+
+
+def _conid_cache_path() -> str:
+    # Same per-user cache dir as the earnings cache; conIds are stable until expiry.
+    base = Path(os.environ.get('FORWARD_VOL_CACHE_DIR') or (Path.home() / '.forward-volatility'))
+    try:
+        base.mkdir(parents=True, exist_ok=True)
+    except Exception:
+        pass
+    return os.environ.get('OPTION_CONID_CACHE_FILE') or str(base / 'option_conids.json')
+
+
+@dataclass(frozen=True)
+class Opportunity:
+    """The calendar spread fields of one scan-results opportunity."""
+    ticker: str
+    strike: Optional[float]
+    spread_type: str
+    net_debit: Optional[float]
+    expiry_front: Optional[str]
+    expiry_back: Optional[str]
+    
+    @classmethod
+    def from_dict(cls, opp: dict) -> 'Opportunity':
+        trade_details = opp.get('trade_details') or {}
+        return cls(
+            ticker=opp['ticker'],
+            strike=trade_details.get('strike'),
+            spread_type=trade_details.get('spread_type', 'CALL'),
+            net_debit=trade_details.get('net_debit'),
+            expiry_front=opp.get('expiry1'),
+            expiry_back=opp.get('expiry2'),
+        )
+    
+    @property
+    def option_type(self) -> str:
+        return 'C' if self.spread_type.upper() == 'CALL' else 'P'
+    
+    @property
+    def complete(self) -> bool:
+        return bool(self.strike and self.expiry_front and self.expiry_back)
+
 
 class CalendarOrderPlacer:
     """Places calendar spread orders in TWS without transmitting."""
     
-    def __init__(self, host=None, port=None, client_id=None):
+    def __init__(self, host=None, port=None, client_id=None, pool=None):
         """
         Initialize IB connection.
         
@@ -34,6 +93,7 @@ class CalendarOrderPlacer:
             host: IB Gateway/TWS host (default: localhost)
             port: 7498 for TWS (matching scanner default)
             client_id: Unique client ID (use different from scanner)
+            pool: Optional IBConnectionPool; its shared connection is used instead
         """
         if host is None:
             host = os.environ.get('IB_HOST', '127.0.0.1')
@@ -41,14 +101,23 @@ class CalendarOrderPlacer:
             port = int(os.environ.get('IB_PORT', '7498'))
         if client_id is None:
             client_id = int(os.environ.get('IB_CLIENT_ID', '10'))
-        self.ib = IB()
+        self.pool = pool
+        self.ib = pool.get() if pool is not None else IB()
         self.host = host
         self.port = port
         self.client_id = client_id
         self.connected = False
+        # "SYMBOL|EXPIRY|STRIKE|RIGHT" -> [conId, localSymbol]
+        self.conid_cache_file = _conid_cache_path()
+        self._conids = self._load_conids()
+        self._conids_dirty = False
     
     def connect(self, max_retries=3):
         """Connect to IB Gateway or TWS with retry logic."""
+        if self.pool is not None and self.ib.isConnected():
+            # Shared connection is already up
+            self.connected = True
+            return True
         for attempt in range(max_retries):
             try:
                 if attempt > 0:
@@ -56,8 +125,12 @@ class CalendarOrderPlacer:
                     print(f"  Retrying in {wait_time} seconds (attempt {attempt + 1}/{max_retries})...")
                     time.sleep(wait_time)
                 
-                print(f"Connecting to Interactive Brokers at {self.host}:{self.port}...")
-                self.ib.connect(self.host, self.port, clientId=self.client_id, timeout=10)
+                if self.pool is not None:
+                    print(f"Connecting to Interactive Brokers at {self.pool.host}:{self.pool.port}...")
+                    self.pool.connect(timeout=10)
+                else:
+                    print(f"Connecting to Interactive Brokers at {self.host}:{self.port}...")
+                    self.ib.connect(self.host, self.port, clientId=self.client_id, timeout=10)
                 self.connected = True
                 print("  Connected successfully!")
                 return True
@@ -69,11 +142,78 @@ class CalendarOrderPlacer:
         return False
     
     def disconnect(self):
-        """Disconnect from IB."""
+        """Disconnect from IB (a pooled connection stays open for its other users)."""
         if self.connected:
-            self.ib.disconnect()
+            if self.pool is None:
+                self.ib.disconnect()
+                print("Disconnected from IB")
             self.connected = False
-            print("Disconnected from IB")
+    
+    @staticmethod
+    def _option_key(option) -> str:
+        return f"{option.symbol}|{option.lastTradeDateOrContractMonth}|{float(option.strike):g}|{option.right}"
+    
+    def _load_conids(self) -> dict:
+        """Load cached option conIds, dropping contracts that have expired."""
+        try:
+            with open(self.conid_cache_file, 'r') as f:
+                rows = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            print(f"  Warning: Could not read {self.conid_cache_file}: {e}")
+            return {}
+        today = datetime.now().strftime('%Y%m%d')
+        return {k: v for k, v in rows.items() if k.split('|')[1] >= today}
+    
+    def _save_conids(self):
+        if not self._conids_dirty:
+            return
+        tmp = self.conid_cache_file + '.tmp'
+        try:
+            with open(tmp, 'w') as f:
+                json.dump(self._conids, f)
+            os.replace(tmp, self.conid_cache_file)
+            self._conids_dirty = False
+        except Exception as e:
+            print(f"  Warning: Could not save {self.conid_cache_file}: {e}")
+    
+    def qualify_options(self, options: list):
+        """
+        Qualify options, asking TWS only for contracts missing from the conId cache.
+        
+        Cached legs get conId and localSymbol filled in directly; new ones are
+        qualified in one batch and added to the cache on disk.
+        """
+        missing = []
+        for o in options:
+            hit = self._conids.get(self._option_key(o))
+            if hit:
+                o.conId, o.localSymbol = hit
+            else:
+                missing.append(o)
+        
+        if missing:
+            self.ib.qualifyContracts(*missing)
+            for o in missing:
+                if o.conId:
+                    self._conids[self._option_key(o)] = [o.conId, o.localSymbol]
+                    self._conids_dirty = True
+            self._save_conids()
+    
+    @staticmethod
+    def _build_combo(ticker: str, front_con_id: int, back_con_id: int) -> Contract:
+        """BAG contract that sells the front leg and buys the back leg (ratio 1 each)."""
+        return Contract(
+            symbol=ticker,
+            secType='BAG',
+            currency='USD',
+            exchange='SMART',
+            comboLegs=[
+                ComboLeg(conId=front_con_id, ratio=1, action='SELL', exchange='SMART'),
+                ComboLeg(conId=back_con_id, ratio=1, action='BUY', exchange='SMART'),
+            ],
+        )
     
     def create_calendar_spread(self, ticker: str, strike: float, expiry_front: str, 
                                 expiry_back: str, option_type: str = 'C') -> Contract:
@@ -95,42 +235,70 @@ class CalendarOrderPlacer:
         back_option = Option(ticker, expiry_back, strike, option_type, 'SMART')
         
         # Qualify contracts to get conIds
-        self.ib.qualifyContracts(front_option, back_option)
+        self.qualify_options([front_option, back_option])
         
         print(f"  Front leg: {front_option.localSymbol} (conId: {front_option.conId})")
         print(f"  Back leg:  {back_option.localSymbol} (conId: {back_option.conId})")
         
-        # Create combo legs
-        # Sell front month (action=SELL, ratio=1)
-        front_leg = ComboLeg(
-            conId=front_option.conId,
-            ratio=1,
-            action='SELL',
-            exchange='SMART'
-        )
-        
-        # Buy back month (action=BUY, ratio=1)
-        back_leg = ComboLeg(
-            conId=back_option.conId,
-            ratio=1,
-            action='BUY',
-            exchange='SMART'
-        )
+        return self._build_combo(ticker, front_option.conId, back_option.conId)
+    
+    def quote_mids(self, options: list) -> dict:
+        """
+        Get mid prices for many qualified options, MKT_DATA_WAVE_SIZE legs at a time.
         
-        # Create the combo contract
-        combo = Contract()
-        combo.symbol = ticker
-        combo.secType = 'BAG'
-        combo.currency = 'USD'
-        combo.exchange = 'SMART'
-        combo.comboLegs = [front_leg, back_leg]
+        Each wave's subscriptions are opened together and we wait on ticker
+        updates until every leg has a bid and ask (or MKT_DATA_TIMEOUT_SECONDS
+        passes), so a large batch never exceeds the market data line limit.
         
-        return combo
+        Returns:
+            Dict mapping conId to mid price
+        """
+        unique = list({o.conId: o for o in options if o.conId}.values())
+        mids = {}
+        for start in range(0, len(unique), MKT_DATA_WAVE_SIZE):
+            mids.update(self._quote_wave(unique[start:start + MKT_DATA_WAVE_SIZE]))
+        return mids
+    
+    def _quote_wave(self, wave: list) -> dict:
+        """Mid prices for one wave of options; subscriptions are always cancelled."""
+        tickers = []
+        try:
+            for o in wave:
+                tickers.append(self.ib.reqMktData(o, '', False, False))
+            
+            deadline = time.monotonic() + MKT_DATA_TIMEOUT_SECONDS
+            while not all(t.bid and t.bid > 0 and t.ask and t.ask > 0 for t in tickers):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.ib.waitOnUpdate(timeout=remaining)
+            
+            mid_array = mid_prices(
+                [t.bid for t in tickers], [t.ask for t in tickers], [t.last for t in tickers]
+            )
+            return dict(zip((o.conId for o in wave), mid_array.tolist()))
+        finally:
+            # Cancel market data to free the lines for the next wave
+            for o in wave[:len(tickers)]:
+                try:
+                    self.ib.cancelMktData(o)
+                except Exception:
+                    pass
+    
+    def wait_for_acks(self, trades: list):
+        """Wait on order-status updates until TWS has acknowledged every trade (or timeout)."""
+        deadline = time.monotonic() + ORDER_ACK_TIMEOUT_SECONDS
+        while any(t.orderStatus.status == 'PendingSubmit' for t in trades):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            self.ib.waitOnUpdate(timeout=remaining)
     
     def place_calendar_order(self, ticker: str, strike: float, expiry_front: str,
                               expiry_back: str, option_type: str = 'C',
                               quantity: int = 1, limit_price: float = None,
-                              transmit: bool = False):
+                              transmit: bool = False, legs: tuple = None,
+                              mids: dict = None, wait_ack: bool = True):
         """
         Place a calendar spread order in TWS as a single combo order.
         
@@ -143,6 +311,10 @@ class CalendarOrderPlacer:
             quantity: Number of spreads (default: 1)
             limit_price: Limit price for the spread (net debit, positive value)
             transmit: If False, order appears in TWS but isn't sent (default: False)
+            legs: Already-qualified (front, back) options; qualified here if omitted
+            mids: conId -> mid price from quote_mids(); legs are quoted here if omitted
+            wait_ack: Wait for TWS to acknowledge the order before returning
+                      (batch callers pass False and wait once for all trades)
         
         Returns:
             Trade object or None on error
@@ -154,75 +326,44 @@ class CalendarOrderPlacer:
             print(f"  Back:  {expiry_back} (BUY)")
             print(f"  Qty:   {quantity}")
             
-            # Create option contracts
-            front_option = Option(ticker, expiry_front, strike, option_type, 'SMART')
-            back_option = Option(ticker, expiry_back, strike, option_type, 'SMART')
+            if legs is None:
+                # Create option contracts
+                front_option = Option(ticker, expiry_front, strike, option_type, 'SMART')
+                back_option = Option(ticker, expiry_back, strike, option_type, 'SMART')
+                
+                # Qualify contracts to get conIds
+                print(f"  Qualifying contracts...")
+                self.qualify_options([front_option, back_option])
+            else:
+                front_option, back_option = legs
             
-            # Qualify contracts to get conIds
-            print(f"  Qualifying contracts...")
-            self.ib.qualifyContracts(front_option, back_option)
-            self.ib.sleep(0.5)
+            if not front_option.conId or not back_option.conId:
+                print(f"  ❌ Could not qualify option contracts")
+                return None
             
             print(f"  Front: {front_option.localSymbol} (conId: {front_option.conId})")
             print(f"  Back:  {back_option.localSymbol} (conId: {back_option.conId})")
             
             # Get current prices for the spread
-            print(f"  Getting option prices...")
-            front_ticker = self.ib.reqMktData(front_option, '', False, False)
-            back_ticker = self.ib.reqMktData(back_option, '', False, False)
-            self.ib.sleep(2)
-            
-            # Get mid prices
-            front_bid = front_ticker.bid if front_ticker.bid and front_ticker.bid > 0 else 0
-            front_ask = front_ticker.ask if front_ticker.ask and front_ticker.ask > 0 else 0
-            front_mid = (front_bid + front_ask) / 2 if front_bid and front_ask else front_ticker.last or 0
-            
-            back_bid = back_ticker.bid if back_ticker.bid and back_ticker.bid > 0 else 0
-            back_ask = back_ticker.ask if back_ticker.ask and back_ticker.ask > 0 else 0
-            back_mid = (back_bid + back_ask) / 2 if back_bid and back_ask else back_ticker.last or 0
-            
-            # Cancel market data
-            self.ib.cancelMktData(front_option)
-            self.ib.cancelMktData(back_option)
+            if mids is None:
+                print(f"  Getting option prices...")
+                mids = self.quote_mids([front_option, back_option])
+            front_mid = mids.get(front_option.conId, 0)
+            back_mid = mids.get(back_option.conId, 0)
             
             current_debit = back_mid - front_mid
             print(f"  Front mid: ${front_mid:.2f}")
             print(f"  Back mid:  ${back_mid:.2f}")
             print(f"  Current spread: ${current_debit:.2f}")
             
-            # Create combo legs
-            # Sell front month (action=SELL, ratio=1)
-            front_leg = ComboLeg(
-                conId=front_option.conId,
-                ratio=1,
-                action='SELL',
-                exchange='SMART'
-            )
-            
-            # Buy back month (action=BUY, ratio=1)
-            back_leg = ComboLeg(
-                conId=back_option.conId,
-                ratio=1,
-                action='BUY',
-                exchange='SMART'
-            )
-            
-            # Create the combo contract
-            combo = Contract()
-            combo.symbol = ticker
-            combo.secType = 'BAG'
-            combo.currency = 'USD'
-            combo.exchange = 'SMART'
-            combo.comboLegs = [front_leg, back_leg]
+            combo = self._build_combo(ticker, front_option.conId, back_option.conId)
             
             # Determine limit price
             # Use provided limit_price, or current spread, or minimal
             if limit_price is not None:
                 spread_limit = limit_price
-            elif current_debit > 0:
-                spread_limit = round(current_debit, 2)
             else:
-                spread_limit = 0.05
+                spread_limit = float(spread_limits([front_mid], [back_mid])[0])
             
             # Create limit order for the combo
             # For calendar spread debit: positive limit price = max we'll pay
@@ -243,11 +384,12 @@ class CalendarOrderPlacer:
             
             # Place the combo order
             trade = self.ib.placeOrder(combo, order)
-            self.ib.sleep(1)
             
             print(f"\n  ✅ Calendar spread staged in TWS!")
             print(f"  Order ID: {trade.order.orderId}")
-            print(f"  Status: {trade.orderStatus.status}")
+            if wait_ack:
+                self.wait_for_acks([trade])
+                print(f"  Status: {trade.orderStatus.status}")
             
             return trade
             
@@ -268,8 +410,12 @@ class CalendarOrderPlacer:
             quantity: Contracts per trade (default: 1)
             transmit: If True, actually send orders (default: False)
         """
-        with open(json_file, 'r') as f:
-            data = json.load(f)
+        if ORJSON_AVAILABLE:
+            with open(json_file, 'rb') as f:
+                data = orjson.loads(f.read())
+        else:
+            with open(json_file, 'r') as f:
+                data = json.load(f)
         
         opportunities = data.get('opportunities', [])
         
@@ -288,71 +434,111 @@ class CalendarOrderPlacer:
         print(f"Transmit: {transmit}")
         print()
         
-        placed = []
+        staged = []
         failed = []
         
-        for opp in opportunities:
-            ticker = opp['ticker']
-            trade_details = opp.get('trade_details', {})
-            
-            # Get trade parameters
-            strike = trade_details.get('strike')
-            spread_type = trade_details.get('spread_type', 'CALL')
-            option_type = 'C' if spread_type.upper() == 'CALL' else 'P'
-            net_debit = trade_details.get('net_debit')
-            
-            expiry_front = opp.get('expiry1')
-            expiry_back = opp.get('expiry2')
-            
-            if not all([strike, expiry_front, expiry_back]):
-                print(f"\n⚠️ Skipping {ticker}: Missing trade details")
-                failed.append(ticker)
+        # Pass 1: validate opportunities and build every option leg up front
+        jobs = []
+        for opp in map(Opportunity.from_dict, opportunities):
+            if not opp.complete:
+                print(f"\n⚠️ Skipping {opp.ticker}: Missing trade details")
+                failed.append(opp.ticker)
                 continue
+            jobs.append(opp)
+        
+        # One Option per distinct contract; spreads sharing a leg share the object
+        unique_options = {}
+        legs = []
+        for opp in jobs:
+            pair = []
+            for expiry in (opp.expiry_front, opp.expiry_back):
+                key = (opp.ticker, expiry, float(opp.strike), opp.option_type)
+                if key not in unique_options:
+                    unique_options[key] = Option(opp.ticker, expiry, opp.strike, opp.option_type, 'SMART')
+                pair.append(unique_options[key])
+            legs.append(tuple(pair))
+        options = list(unique_options.values())
+        
+        # Pass 2: qualify all legs in one batch instead of one round-trip per spread
+        if options:
+            print(f"Qualifying {len(options)} option contracts...")
+            self.qualify_options(options)
+        
+        # One market-data wave for every leg in the batch
+        mids = {}
+        if options:
+            print(f"Getting option prices...")
+            mids = self.quote_mids(options)
+        
+        # Fallback limits for every spread in one pass (used where the scan has no net debit)
+        limits = spread_limits(
+            [mids.get(front.conId, 0) for front, _ in legs],
+            [mids.get(back.conId, 0) for _, back in legs],
+        ).tolist()
+        
+        for i, opp in enumerate(jobs):
+            limit = opp.net_debit if opp.net_debit is not None else limits[i]
             
             # Place the order
             trades = self.place_calendar_order(
-                ticker=ticker,
-                strike=strike,
-                expiry_front=expiry_front,
-                expiry_back=expiry_back,
-                option_type=option_type,
+                ticker=opp.ticker,
+                strike=opp.strike,
+                expiry_front=opp.expiry_front,
+                expiry_back=opp.expiry_back,
+                option_type=opp.option_type,
                 quantity=quantity,
-                limit_price=net_debit,
-                transmit=transmit
+                limit_price=limit,
+                transmit=transmit,
+                legs=legs[i],
+                mids=mids,
+                wait_ack=False
             )
             
             if trades:
-                placed.append({
-                    'ticker': ticker,
-                    'strike': strike,
-                    'type': spread_type,
-                    'front': expiry_front,
-                    'back': expiry_back,
-                    'price': net_debit,
-                    'order_id': trades.order.orderId
-                })
+                staged.append((opp, limit, trades))
             else:
-                failed.append(ticker)
+                failed.append(opp.ticker)
         
-        # Summary
-        print(f"\n{'=' * 60}")
-        print("SUMMARY")
-        print(f"{'=' * 60}")
-        print(f"✅ Orders staged: {len(placed)}")
-        print(f"❌ Failed: {len(failed)}")
+        # Every order is already with TWS; wait for all acknowledgements together
+        self.wait_for_acks([trade for _, _, trade in staged])
+        placed = [
+            {
+                'ticker': opp.ticker,
+                'strike': opp.strike,
+                'type': opp.spread_type,
+                'front': opp.expiry_front,
+                'back': opp.expiry_back,
+                'price': limit,
+                'order_id': trade.order.orderId,
+                'status': trade.orderStatus.status
+            }
+            for opp, limit, trade in staged
+        ]
+        
+        # Summary (built up and written in one go)
+        lines = [
+            f"\n{'=' * 60}",
+            "SUMMARY",
+            f"{'=' * 60}",
+            f"✅ Orders staged: {len(placed)}",
+            f"❌ Failed: {len(failed)}",
+        ]
         
         if placed:
-            print("\nStaged Orders:")
-            for p in placed:
-                print(f"  • {p['ticker']} {p['type']} ${p['strike']} "
-                      f"{p['front']}/{p['back']} @ ${p['price']:.2f} "
-                      f"(Order #{p['order_id']})")
+            lines.append("\nStaged Orders:")
+            lines.extend(
+                f"  • {p['ticker']} {p['type']} ${p['strike']} "
+                f"{p['front']}/{p['back']} @ ${p['price']:.2f} "
+                f"(Order #{p['order_id']}, {p['status']})"
+                for p in placed
+            )
         
         if failed:
-            print(f"\nFailed: {', '.join(failed)}")
+            lines.append(f"\nFailed: {', '.join(failed)}")
         
-        print("\n⚠️ Orders are STAGED in TWS but NOT transmitted.")
-        print("   Review in TWS and manually transmit when ready.")
+        lines.append("\n⚠️ Orders are STAGED in TWS but NOT transmitted.")
+        lines.append("   Review in TWS and manually transmit when ready.")
+        sys.stdout.write("\n".join(lines) + "\n")
         
         return placed
 
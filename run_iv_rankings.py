@@ -3,13 +3,30 @@ Scan all tickers across all lists and rank by near-term IV
 Uses the existing rank_tickers_by_iv functionality from scanner_ib
 """
 import json
+from dataclasses import asdict
 from datetime import datetime, timedelta
-from scanner_ib import IBScanner, rank_tickers_by_iv, rank_tickers_by_underlying_iv
-from nasdaq100 import get_nasdaq_100_list
-from midcap400 import get_midcap400_list, get_mag7
+import numpy as np
+from scanner_ib import IBScanner, IVResult, rank_tickers_by_iv, rank_tickers_by_underlying_iv
+from nasdaq100 import get_nasdaq_100_list, NASDAQ100_SET
+from midcap400 import get_midcap400_list, get_mag7, MIDCAP400_SET
+from universe_lists import MAG7
 from earnings_checker import EarningsChecker
 import time
 import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
 
 # Days after earnings to exclude (IV already crushed)
 DAYS_AFTER_EARNINGS_EXCLUDE = int(os.environ.get('EARNINGS_IGNORE_PAST_DAYS', '3'))
@@ -27,38 +44,124 @@ IV_RANKINGS_METHOD = os.environ.get('IV_RANKINGS_METHOD', 'underlying').strip().
 IV_RANKINGS_FETCH_MISSING_EARNINGS = os.environ.get('IV_RANKINGS_FETCH_MISSING_EARNINGS', '0').strip() in ('1', 'true', 'yes', 'y')
 
 
+def _encode_json(data) -> bytes:
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2).encode('utf-8')
+
+
+def _iv_summary(iv: np.ndarray) -> dict:
+    """Highest/lowest/average/median of the ranked IVs."""
+    if not len(iv):
+        return {'highest_iv': 0, 'lowest_iv': 0, 'average_iv': 0, 'median_iv': 0}
+    return {
+        'highest_iv': float(iv.max()),
+        'lowest_iv': float(iv.min()),
+        'average_iv': round(float(iv.mean()), 2),
+        'median_iv': float(np.median(iv)),
+    }
+
+
+# Row template for the top-20 table and its 200MA trend column
+_TOP_ROW = "{rank:<6} {ticker:<8} ${price:<9.2f} {iv:<9.1f}% {earnings:<12} {trend:<8}"
+_TREND_LABELS = {True: 'ABOVE', False: 'BELOW', None: '-'}
+
+# Universe memberships, built once at import
+_MAG7_SET = frozenset(MAG7)
+
+# universe argument -> (display name, tickers); each list is built once here
+_UNIVERSES = {
+    'mag7': ("MAG7", tuple(get_mag7())),
+    'nasdaq100': ("NASDAQ 100", tuple(get_nasdaq_100_list())),
+    'midcap400': ("S&P MidCap 400", tuple(get_midcap400_list())),
+    'all': ("ALL (MAG7 + NASDAQ 100 + MidCap 400)", tuple(sorted(_MAG7_SET | NASDAQ100_SET | MIDCAP400_SET))),
+}
+
+# Sorted universe arrays for vectorized membership tests
+_MAG7_ARRAY = np.array(sorted(_MAG7_SET))
+_NASDAQ100_ARRAY = np.array(sorted(NASDAQ100_SET))
+
+
+def _universe_labels(tickers: list) -> list:
+    """Universe per ticker (MAG7, then NASDAQ100, else MIDCAP400) from one np.isin pass per list."""
+    if not tickers:
+        return []
+    arr = np.array(tickers)
+    labels = np.select(
+        [np.isin(arr, _MAG7_ARRAY), np.isin(arr, _NASDAQ100_ARRAY)],
+        ['MAG7', 'NASDAQ100'],
+        default='MIDCAP400',
+    )
+    return labels.tolist()
+
+
 def _parse_yyyy_mm_dd(date_str: str):
     try:
         return datetime.strptime(date_str, '%Y-%m-%d').date()
     except Exception:
         return None
 
+def _iso_or_none(d):
+    return d.isoformat() if d else None
+
+def _extract_earnings(filename: str) -> list:
+    """(ticker, next_earnings) pairs from one scan results file; [] if unreadable."""
+    pairs = []
+    try:
+        if IJSON_AVAILABLE:
+            # Stream just the two fields instead of materializing every opportunity
+            with open(filename, 'rb') as f:
+                ticker = earnings = None
+                for prefix, event, value in ijson.parse(f):
+                    if prefix == 'opportunities.item.ticker':
+                        ticker = value
+                    elif prefix == 'opportunities.item.next_earnings':
+                        earnings = value
+                    elif prefix == 'opportunities.item' and event == 'end_map':
+                        if ticker and earnings:
+                            pairs.append((ticker, earnings))
+                        ticker = earnings = None
+        else:
+            with open(filename, 'r') as f:
+                data = json.load(f)
+            for opp in data.get('opportunities', []):
+                ticker = opp.get('ticker')
+                earnings = opp.get('next_earnings')
+                if ticker and earnings:
+                    pairs.append((ticker, earnings))
+    except FileNotFoundError:
+        return []
+    except Exception as e:
+        print(f"Warning: Could not load {filename}: {e}")
+        return []
+    return pairs
+
 def load_earnings_from_scans():
-    """Load earnings dates from main scan result files."""
+    """Load earnings dates from main scan result files (read concurrently).
+    
+    Returns:
+        Dict of ticker -> next earnings as a datetime.date (unparseable dates are dropped)
+    """
     earnings_map = {}
+    filenames = ['nasdaq100_results_latest.json', 'midcap400_results_latest.json', 'mag7_results_latest.json']
     
-    for filename in ['nasdaq100_results_latest.json', 'midcap400_results_latest.json', 'mag7_results_latest.json']:
-        try:
-            with open(filename, 'r') as f:
-                data = json.load(f)
-                for opp in data.get('opportunities', []):
-                    ticker = opp.get('ticker')
-                    earnings = opp.get('next_earnings')
-                    if ticker and earnings:
-                        earnings_map[ticker] = earnings
-        except FileNotFoundError:
-            pass
-        except Exception as e:
-            print(f"Warning: Could not load {filename}: {e}")
+    # Later files win on duplicate tickers, same as reading them in order
+    with ThreadPoolExecutor(max_workers=len(filenames)) as executor:
+        for pairs in executor.map(_extract_earnings, filenames):
+            earnings_map.update(pairs)
     
-    return earnings_map
+    # Parse once here so the ranking filter only compares dates
+    parsed = {ticker: _parse_yyyy_mm_dd(earnings) for ticker, earnings in earnings_map.items()}
+    return {ticker: earnings for ticker, earnings in parsed.items() if earnings}
 
-def scan_iv_rankings(universe='all', top_n=None):
+def scan_iv_rankings(universe='all', top_n=None, pool=None, verbose=False):
     """Scan tickers and rank by near-term implied volatility.
     
     Args:
         universe: Which universe to scan - 'mag7', 'nasdaq100', 'midcap400', or 'all'
         top_n: Number of results to return (None = all)
+        pool: Optional IBConnectionPool to scan over a shared connection
+        verbose: Also list each ticker removed by the earnings filter
     
     Returns:
         List of tickers with their IV rankings
@@ -70,18 +173,8 @@ def scan_iv_rankings(universe='all', top_n=None):
     print()
     
     # Determine which tickers to scan
-    if universe == 'mag7':
-        tickers = get_mag7()
-        universe_name = "MAG7"
-    elif universe == 'nasdaq100':
-        tickers = get_nasdaq_100_list()
-        universe_name = "NASDAQ 100"
-    elif universe == 'midcap400':
-        tickers = get_midcap400_list()
-        universe_name = "S&P MidCap 400"
-    else:  # 'all'
-        tickers = list(set(get_mag7() + get_nasdaq_100_list() + get_midcap400_list()))
-        universe_name = "ALL (MAG7 + NASDAQ 100 + MidCap 400)"
+    universe_name, universe_tickers = _UNIVERSES.get(universe, _UNIVERSES['all'])
+    tickers = list(universe_tickers)
     
     print(f"Universe: {universe_name}")
     print(f"Total tickers: {len(tickers)}")
@@ -89,7 +182,7 @@ def scan_iv_rankings(universe='all', top_n=None):
         print(f"Returning top: {top_n}")
     print()
     
-    scanner = IBScanner(check_earnings=False)
+    scanner = IBScanner(check_earnings=False, pool=pool)
     
     if not scanner.connect():
         print("[ERROR] Could not connect to Interactive Brokers")
@@ -124,60 +217,52 @@ def scan_iv_rankings(universe='all', top_n=None):
         
         # Filter out tickers with recent or upcoming earnings
         print(f"Filtering out tickers with earnings within {DAYS_AFTER_EARNINGS_EXCLUDE} days ago or {DAYS_BEFORE_EARNINGS_EXCLUDE} days ahead...")
-        earnings_checker = EarningsChecker()
         today = datetime.now().date()
+        # Exclusion window as absolute dates so each ticker is a single range check
+        window_start = today - timedelta(days=DAYS_AFTER_EARNINGS_EXCLUDE)
+        window_end = today + timedelta(days=DAYS_BEFORE_EARNINGS_EXCLUDE)
+        
+        # Prefer earnings dates already embedded in scan JSON (fast, no API calls)
+        earnings_dates = {ticker: earnings_map[ticker] for ticker, _, _ in ranked if ticker in earnings_map}
+        
+        # Optional fallback: one cached batch lookup for tickers the scans don't cover.
+        missing = [t for t, _, _ in ranked if t not in earnings_dates]
+        if missing and IV_RANKINGS_FETCH_MISSING_EARNINGS:
+            with EarningsChecker() as earnings_checker:
+                for ticker, dt in earnings_checker.check_batch(missing).items():
+                    if dt:
+                        earnings_dates[ticker] = dt.date()
+        
         filtered_ranked = []
-        removed_count = 0
+        removed = []
         
         for ticker, iv, price in ranked:
-            # Prefer earnings dates already embedded in scan JSON (fast, no API calls)
-            earnings_date = None
-
-            mapped = earnings_map.get(ticker)
-            if mapped:
-                earnings_date = _parse_yyyy_mm_dd(mapped)
-
-            # Optional fallback: fetch missing earnings via cached earnings checker.
-            if earnings_date is None and IV_RANKINGS_FETCH_MISSING_EARNINGS:
-                earnings_date = earnings_checker.get_earnings_date(ticker)
-
-            if earnings_date:
-                days_diff = (earnings_date - today).days
-                if -DAYS_AFTER_EARNINGS_EXCLUDE <= days_diff <= DAYS_BEFORE_EARNINGS_EXCLUDE:
-                    print(f"    [EARNINGS] Removing {ticker}: Earnings on {earnings_date} ({days_diff} days)")
-                    removed_count += 1
-                    continue
+            earnings_date = earnings_dates.get(ticker)
+            if earnings_date and window_start <= earnings_date <= window_end:
+                removed.append((ticker, earnings_date))
+                continue
             filtered_ranked.append((ticker, iv, price))
         
-        print(f"Removed {removed_count} tickers with earnings in window")
+        if verbose and removed:
+            sys.stdout.write("".join(
+                f"    [EARNINGS] Removing {ticker}: Earnings on {earnings_date} ({(earnings_date - today).days} days)\n"
+                for ticker, earnings_date in removed
+            ))
+        print(f"Removed {len(removed)} tickers with earnings in window")
         ranked = filtered_ranked
+        ivs = np.fromiter((iv for _, iv, _ in ranked), dtype=np.float64, count=len(ranked))
         
-        # Get 200MA data from scanner
-        mag7_list = get_mag7()
-        nasdaq100_list = get_nasdaq_100_list()
+        # Determine which universe each ticker belongs to, all at once
+        universes = _universe_labels([t for t, _, _ in ranked])
         
-        # Format results - ranked is list of (ticker, iv, price) tuples
-        results = []
-        for ticker, iv, price in ranked:
-            # Determine which universe this ticker belongs to
-            ticker_universe = 'MAG7' if ticker in mag7_list else \
-                            'NASDAQ100' if ticker in nasdaq100_list else \
-                            'MIDCAP400'
-            
-            # Get next earnings date from pre-loaded scan results
-            next_earnings = earnings_map.get(ticker)
-            
-            # Get 200MA (we don't have it from rank_tickers_by_iv, so set to None)
-            result = {
-                'ticker': ticker,
-                'price': price,
-                'iv': iv,
-                'ma_200': None,
-                'above_ma_200': None,
-                'universe': ticker_universe,
-                'next_earnings': next_earnings
-            }
-            results.append(result)
+        # Format results - ranked is list of (ticker, iv, price) tuples.
+        # Earnings come from the pre-loaded scan results; 200MA isn't available
+        # from rank_tickers_by_iv, so it stays None.
+        results = [
+            IVResult(ticker, price, iv, universe=ticker_universe,
+                     next_earnings=_iso_or_none(earnings_map.get(ticker)))
+            for (ticker, iv, price), ticker_universe in zip(ranked, universes)
+        ]
         
         # Create result object
         result_data = {
@@ -185,45 +270,51 @@ def scan_iv_rankings(universe='all', top_n=None):
             'date': datetime.now().strftime('%Y-%m-%d'),
             'universe': universe_name,
             'total_scanned': len(results),
-            'rankings': results,
-            'summary': {
-                'highest_iv': results[0]['iv'] if results else 0,
-                'lowest_iv': results[-1]['iv'] if results else 0,
-                'average_iv': round(sum(r['iv'] for r in results) / len(results), 2) if results else 0,
-                'median_iv': results[len(results)//2]['iv'] if results else 0
-            }
+            'rankings': [asdict(r) for r in results],
+            'summary': _iv_summary(ivs)
         }
         
-        # Save results
+        # Save results (encoded once, written to both files)
+        payload = _encode_json(result_data)
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         filename = f"iv_rankings_{universe}_{timestamp}.json"
         
-        with open(filename, 'w') as f:
-            json.dump(result_data, f, indent=2)
+        with open(filename, 'wb') as f:
+            f.write(payload)
         
         print(f"[OK] Results saved to: {filename}")
         
         # Save latest file
         latest_filename = f"iv_rankings_{universe}_latest.json"
-        with open(latest_filename, 'w') as f:
-            json.dump(result_data, f, indent=2)
+        with open(latest_filename, 'wb') as f:
+            f.write(payload)
         
         print(f"[OK] Latest results saved to: {latest_filename}")
         
-        # Print top 20
-        print()
-        print("=" * 80)
-        print("TOP 20 BY IMPLIED VOLATILITY")
-        print("=" * 80)
-        print(f"{'Rank':<6} {'Ticker':<8} {'Price':<10} {'IV':<10} {'Earnings':<12} {'Trend':<8}")
-        print("-" * 80)
+        # Print top 20 (built up and written in one go)
+        lines = [
+            "",
+            "=" * 80,
+            "TOP 20 BY IMPLIED VOLATILITY",
+            "=" * 80,
+            f"{'Rank':<6} {'Ticker':<8} {'Price':<10} {'IV':<10} {'Earnings':<12} {'Trend':<8}",
+            "-" * 80,
+        ]
         
-        for i, r in enumerate(results[:20], 1):
-            trend = "ABOVE" if r.get('above_ma_200') else "BELOW" if r.get('above_ma_200') is not None else "-"
-            earnings = r.get('next_earnings', '-') or '-'
-            print(f"{i:<6} {r['ticker']:<8} ${r['price']:<9.2f} {r['iv']:<9.1f}% {earnings:<12} {trend:<8}")
+        lines.extend(
+            _TOP_ROW.format(
+                rank=i,
+                ticker=r.ticker,
+                price=r.price,
+                iv=r.iv,
+                earnings=r.next_earnings or '-',
+                trend=_TREND_LABELS.get(r.above_ma_200, '-'),
+            )
+            for i, r in enumerate(results[:20], 1)
+        )
         
-        print("=" * 80)
+        lines.append("=" * 80)
+        sys.stdout.write("\n".join(lines) + "\n")
         
         return result_data
         
@@ -234,19 +325,19 @@ def scan_iv_rankings(universe='all', top_n=None):
 
 
 if __name__ == "__main__":
-    import sys
-
     # Allow command line arguments for universe and top_n
-    universe = sys.argv[1] if len(sys.argv) > 1 else 'all'
-    top_n = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    args = [a for a in sys.argv[1:] if a not in ('-v', '--verbose')]
+    verbose = len(args) != len(sys.argv) - 1
+    universe = args[0] if len(args) > 0 else 'all'
+    top_n = int(args[1]) if len(args) > 1 else None
 
-    if universe not in ['mag7', 'nasdaq100', 'midcap400', 'all']:
+    if universe not in _UNIVERSES:
         print(f"Invalid universe: {universe}")
         print("Valid options: mag7, nasdaq100, midcap400, all")
-        print("Usage: python run_iv_rankings.py [universe] [top_n]")
+        print("Usage: python run_iv_rankings.py [universe] [top_n] [--verbose]")
         sys.exit(1)
 
-    result = scan_iv_rankings(universe=universe, top_n=top_n)
+    result = scan_iv_rankings(universe=universe, top_n=top_n, verbose=verbose)
     if result is None:
         sys.exit(2)
 
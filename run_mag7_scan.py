@@ -3,89 +3,104 @@ Run MAG7 scan with full trade recommendations and save for web display
 """
 import sys
 import json
+from dataclasses import asdict
 from datetime import datetime
-from scanner_ib import IBScanner, rank_tickers_by_iv
+from scanner_ib import IBScanner, IVResult, rank_tickers_by_iv
 from nasdaq100 import get_mag7
+from iv_math import estimate_calendar_prices
+import numpy as np
 import pandas as pd
 import time
+import os
+from concurrent.futures import ThreadPoolExecutor
 from env_loader import load_env
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 load_env(__file__)
 
-def calculate_trade_details(row):
-    """Calculate trade recommendations and P&L estimates"""
-    stock_price = row['price']
+# Minimum seconds between the starts of consecutive ticker scans
+try:
+    MIN_TICKER_INTERVAL = float(os.environ.get('SCAN_TICKER_PAUSE_SECONDS', '0.02'))
+except ValueError:
+    MIN_TICKER_INTERVAL = 0.02
+
+
+def _encode_json(data) -> bytes:
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(data, indent=2).encode('utf-8')
+
+
+def _column(df, name):
+    """Column as a float array, or all-NaN if the scan didn't produce it."""
+    if name in df:
+        return pd.to_numeric(df[name], errors='coerce').to_numpy(dtype=float)
+    return np.full(len(df), np.nan)
+
+def _column_or(df, name, fallback):
+    """Column `name` as floats, with NaNs filled from column `fallback`."""
+    values = _column(df, name)
+    return np.where(np.isnan(values), _column(df, fallback), values)
+
+def calculate_trade_details(df):
+    """Calculate trade recommendations and P&L estimates for every row of df.
+    
+    Works column-wise over the whole frame; returns one dict per row, in row order.
+    """
+    n = len(df)
+    stock_price = _column(df, 'price')
     
     # Use the actual ATM strike from the scan if available, otherwise calculate
-    if pd.notna(row.get('strike1')) and pd.notna(row.get('strike2')):
-        # Use the strike from the front expiry (they should be the same or very close)
-        strike = float(row['strike1'])
-    else:
-        # Fallback: Use appropriate strike interval based on stock price
-        # IB uses: $0.50 for stocks <$25, $1 for $25-$200, $5 for $200-$500, $10 for >$500
-        if stock_price < 25:
-            strike_interval = 0.5
-        elif stock_price < 200:
-            strike_interval = 1.0
-        elif stock_price < 500:
-            strike_interval = 5.0
-        else:
-            strike_interval = 10.0
-        
-        strike = round(stock_price / strike_interval) * strike_interval
+    # IB uses: $0.50 for stocks <$25, $1 for $25-$200, $5 for $200-$500, $10 for >$500
+    strike_interval = np.select(
+        [stock_price < 25, stock_price < 200, stock_price < 500],
+        [0.5, 1.0, 5.0],
+        default=10.0,
+    )
+    strike1 = _column(df, 'strike1')
+    strike = np.where(
+        ~np.isnan(strike1) & ~np.isnan(_column(df, 'strike2')),
+        strike1,
+        np.round(stock_price / strike_interval) * strike_interval,
+    )
     
-    ff_call = row['ff_call'] if pd.notna(row['ff_call']) else 0
-    ff_put = row['ff_put'] if pd.notna(row['ff_put']) else 0
-    above_ma_200 = row.get('above_ma_200', True)  # Default to True if not available
+    ff_call = np.nan_to_num(_column(df, 'ff_call'), nan=0.0)
+    ff_put = np.nan_to_num(_column(df, 'ff_put'), nan=0.0)
+    if 'above_ma_200' in df:
+        above_ma_200 = df['above_ma_200'].to_numpy(dtype=object).astype(bool)
+    else:
+        above_ma_200 = np.ones(n, dtype=bool)  # Default to True if not available
     
     # If FF values are close (within 5%), prefer the side that aligns with trend
-    ff_diff = abs(ff_call - ff_put)
-    max_ff = max(ff_call, ff_put)
+    ff_diff = np.abs(ff_call - ff_put)
+    max_ff = np.maximum(ff_call, ff_put)
+    ff_ratio = np.divide(ff_diff, max_ff, out=np.full(n, np.inf), where=max_ff > 0)
+    is_call = np.where(ff_ratio < 0.05, above_ma_200, ff_call > ff_put)
     
-    if max_ff > 0 and ff_diff / max_ff < 0.05:
-        # FF values are similar - use trend to decide
-        if above_ma_200:
-            spread_type = "CALL"  # Bullish trend -> CALL spread
-            front_iv = row['call_iv1'] / 100 if pd.notna(row['call_iv1']) else row['avg_iv1'] / 100
-            back_iv = row['call_iv2'] / 100 if pd.notna(row['call_iv2']) else row['avg_iv2'] / 100
-            ff_display = ff_call
-        else:
-            spread_type = "PUT"  # Bearish trend -> PUT spread
-            front_iv = row['put_iv1'] / 100 if pd.notna(row['put_iv1']) else row['avg_iv1'] / 100
-            back_iv = row['put_iv2'] / 100 if pd.notna(row['put_iv2']) else row['avg_iv2'] / 100
-            ff_display = ff_put
-    elif ff_call > ff_put:
-        spread_type = "CALL"
-        front_iv = row['call_iv1'] / 100 if pd.notna(row['call_iv1']) else row['avg_iv1'] / 100
-        back_iv = row['call_iv2'] / 100 if pd.notna(row['call_iv2']) else row['avg_iv2'] / 100
-        ff_display = ff_call
-    else:
-        spread_type = "PUT"
-        front_iv = row['put_iv1'] / 100 if pd.notna(row['put_iv1']) else row['avg_iv1'] / 100
-        back_iv = row['put_iv2'] / 100 if pd.notna(row['put_iv2']) else row['avg_iv2'] / 100
-        ff_display = ff_put
+    # Per-side IVs, falling back to the call/put average where a side is missing
+    front_iv = np.where(is_call, _column_or(df, 'call_iv1', 'avg_iv1'),
+                        _column_or(df, 'put_iv1', 'avg_iv1')) / 100
+    back_iv = np.where(is_call, _column_or(df, 'call_iv2', 'avg_iv2'),
+                       _column_or(df, 'put_iv2', 'avg_iv2')) / 100
+    ff_display = np.where(is_call, ff_call, ff_put)
     
-    front_dte = row['dte1']
-    back_dte = row['dte2']
+    front_dte = _column(df, 'dte1')
+    back_dte = _column(df, 'dte2')
     
     # Use actual midpoint prices if available, otherwise estimate
-    if spread_type == "CALL":
-        front_mid = row.get('call1_mid')
-        back_mid = row.get('call2_mid')
-    else:
-        front_mid = row.get('put1_mid')
-        back_mid = row.get('put2_mid')
+    front_mid = np.where(is_call, _column(df, 'call1_mid'), _column(df, 'put1_mid'))
+    back_mid = np.where(is_call, _column(df, 'call2_mid'), _column(df, 'put2_mid'))
+    has_mid = ~np.isnan(front_mid) & ~np.isnan(back_mid)
     
-    if pd.notna(front_mid) and pd.notna(back_mid):
-        # Use actual market midpoint prices
-        front_price = front_mid
-        back_price = back_mid
-        price_source = "market midpoint"
-    else:
-        # Estimate using simplified ATM formula
-        front_price = 0.4 * stock_price * front_iv * (front_dte / 365) ** 0.5
-        back_price = 0.4 * stock_price * back_iv * (back_dte / 365) ** 0.5
-        price_source = "estimated"
+    # Estimate using simplified ATM formula
+    est_front, est_back = estimate_calendar_prices(stock_price, front_iv, back_iv, front_dte, back_dte)
+    front_price = np.where(has_mid, front_mid, est_front)
+    back_price = np.where(has_mid, back_mid, est_back)
     
     net_debit = back_price - front_price
     net_debit_total = net_debit * 100
@@ -95,26 +110,112 @@ def calculate_trade_details(row):
     adverse_case = -net_debit * 0.30
     max_loss = -net_debit
     
-    return {
-        'spread_type': spread_type,
-        'strike': strike,
-        'front_iv': front_iv * 100,
-        'back_iv': back_iv * 100,
-        'ff_display': ff_display,
-        'front_price': front_price,
-        'back_price': back_price,
-        'net_debit': net_debit,
-        'net_debit_total': net_debit_total,
-        'price_source': price_source,
-        'best_case': best_case * 100,
-        'typical_case': typical_case * 100,
-        'adverse_case': adverse_case * 100,
-        'max_loss': max_loss * 100,
-        'best_case_pct': (best_case / net_debit * 100) if net_debit > 0 else 0,
-        'typical_case_pct': (typical_case / net_debit * 100) if net_debit > 0 else 0,
-        'adverse_case_pct': (adverse_case / net_debit * 100) if net_debit > 0 else 0,
-        'max_loss_pct': (max_loss / net_debit * 100) if net_debit > 0 else 0
-    }
+    positive = net_debit > 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        def pct(x):
+            return np.where(positive, x / net_debit * 100, 0.0)
+        trades = pd.DataFrame({
+            'spread_type': np.where(is_call, 'CALL', 'PUT'),
+            'strike': strike,
+            'front_iv': front_iv * 100,
+            'back_iv': back_iv * 100,
+            'ff_display': ff_display,
+            'front_price': front_price,
+            'back_price': back_price,
+            'net_debit': net_debit,
+            'net_debit_total': net_debit_total,
+            'price_source': np.where(has_mid, 'market midpoint', 'estimated'),
+            'best_case': best_case * 100,
+            'typical_case': typical_case * 100,
+            'adverse_case': adverse_case * 100,
+            'max_loss': max_loss * 100,
+            'best_case_pct': pct(best_case),
+            'typical_case_pct': pct(typical_case),
+            'adverse_case_pct': pct(adverse_case),
+            'max_loss_pct': pct(max_loss)
+        })
+    return trades.to_dict('records')
+
+# Nullable float fields copied from the scan into each result, in output order
+_IV_FIELDS = ('call_iv1', 'call_iv2', 'put_iv1', 'put_iv2', 'avg_iv1', 'avg_iv2',
+              'fwd_var_call', 'fwd_var_put', 'fwd_var_avg',
+              'fwd_vol_call', 'fwd_vol_put', 'fwd_vol_avg')
+
+def _object_column(df, name):
+    if name in df:
+        return df[name].to_numpy(dtype=object)
+    return np.full(len(df), None, dtype=object)
+
+def _opportunity_records(df, trades):
+    """Result dicts for the sorted opportunities frame, NaN fields as None."""
+    above_ma_200 = _object_column(df, 'above_ma_200')
+    known = pd.notna(above_ma_200)
+    above_ma_200[known] = [bool(v) for v in above_ma_200[known]]
+    out = pd.DataFrame({
+        'ticker': df['ticker'].to_numpy(dtype=object),
+        'price': _column(df, 'price'),
+        'ma_200': _column(df, 'ma_200'),
+        'above_ma_200': above_ma_200,
+        'expiry1': df['expiry1'].astype(str).to_numpy(dtype=object),
+        'expiry2': df['expiry2'].astype(str).to_numpy(dtype=object),
+        'dte1': df['dte1'].astype(int).to_numpy(),
+        'dte2': df['dte2'].astype(int).to_numpy(),
+        'ff_call': _column(df, 'ff_call'),
+        'ff_put': _column(df, 'ff_put'),
+        'ff_avg': _column(df, 'ff_avg'),
+        'best_ff': _column(df, 'best_ff'),
+        'next_earnings': _object_column(df, 'next_earnings'),
+        **{name: _column(df, name) for name in _IV_FIELDS},
+    })
+    records = out.astype(object).where(out.notna(), None).to_dict('records')
+    for record, trade in zip(records, trades):
+        record['trade'] = trade
+    return records
+
+def _recommendation_lines(rank, result):
+    """Printable lines for one trade recommendation."""
+    trade = result['trade']
+    return [
+        f"#{rank} - {result['ticker']} @ ${result['price']:.2f}",
+        "-" * 80,
+        f"  Expiry Window: {result['expiry1']} ({result['dte1']}d) → {result['expiry2']} ({result['dte2']}d)",
+        "",
+        f"  RECOMMENDED: {trade['spread_type']} CALENDAR SPREAD",
+        f"     Forward Factor: {trade['ff_display']:.3f} ({trade['ff_display']*100:.1f}%)",
+        f"     Front IV: {trade['front_iv']:.2f}% | Back IV: {trade['back_iv']:.2f}%",
+        "",
+        f"  ESTIMATED PRICING (per contract):",
+        f"     Front {trade['spread_type']}: ~${trade['front_price']:.2f} (${trade['front_price']*100:.0f})",
+        f"     Back {trade['spread_type']}:  ~${trade['back_price']:.2f} (${trade['back_price']*100:.0f})",
+        f"     Net Debit:      ~${trade['net_debit']:.2f} (${trade['net_debit_total']:.0f})",
+        "",
+        f"  POTENTIAL OUTCOMES (1 contract):",
+        f"     Best Case:   +${trade['best_case']:.0f} ({trade['best_case_pct']:.0f}%)",
+        f"     Typical:     +${trade['typical_case']:.0f} ({trade['typical_case_pct']:.0f}%)",
+        f"     Adverse:     ${trade['adverse_case']:.0f} ({trade['adverse_case_pct']:.0f}%)",
+        f"     Max Loss:    ${trade['max_loss']:.0f} ({trade['max_loss_pct']:.0f}%)",
+        "",
+        f"  Trade Setup:",
+        f"     • Sell: {result['expiry1']} ${trade['strike']:.0f} {trade['spread_type']}",
+        f"     • Buy:  {result['expiry2']} ${trade['strike']:.0f} {trade['spread_type']}",
+        f"     • Hold until: {result['expiry1']}",
+        "",
+        "=" * 80,
+        "",
+    ]
+
+def _scan_one(scanner, ticker, threshold):
+    """Scan one ticker; returns (opportunities, log message)."""
+    start_time = time.time()
+    try:
+        opportunities = scanner.scan_ticker(ticker, threshold=threshold) or []
+    except Exception as e:
+        return [], f"  Error: {e}"
+    
+    elapsed = time.time() - start_time
+    if opportunities:
+        return opportunities, f"  Found {len(opportunities)} opportunity(ies) ({elapsed:.1f}s)"
+    return [], f"  No opportunities ({elapsed:.1f}s)"
 
 def run_mag7_scan(threshold=0.2):
     """Run scan on MAG7 stocks and return formatted results."""
@@ -149,15 +250,15 @@ def run_mag7_scan(threshold=0.2):
                     if earnings_dt:
                         earnings_date = earnings_dt.strftime('%Y-%m-%d')
                 
-                iv_rankings_data.append({
-                    'ticker': ticker,
-                    'price': float(price) if price else None,
-                    'iv': float(iv) if iv else None,
-                    'ma_200': float(ma_200) if pd.notna(ma_200) else None,
-                    'above_ma_200': bool(above_ma_200) if pd.notna(above_ma_200) else None,
-                    'next_earnings': earnings_date,
-                    'universe': 'MAG7'
-                })
+                iv_rankings_data.append(IVResult(
+                    ticker=ticker,
+                    price=float(price) if price else None,
+                    iv=float(iv) if iv else None,
+                    ma_200=float(ma_200) if pd.notna(ma_200) else None,
+                    above_ma_200=bool(above_ma_200) if pd.notna(above_ma_200) else None,
+                    universe='MAG7',
+                    next_earnings=earnings_date,
+                ))
             print(f"Ranked {len(iv_rankings_data)} tickers by IV")
             print()
         finally:
@@ -166,50 +267,50 @@ def run_mag7_scan(threshold=0.2):
     # Now run the actual scan
     scanner = IBScanner(check_earnings=True)
     
-    if not scanner.connect():
-        print("Could not connect to Interactive Brokers")
-        print("Make sure TWS or IB Gateway is running (see IB_PORT)")
-        return None
-    
-    # Pre-fetch earnings dates for all tickers from IB
-    if scanner.earnings_checker:
-        print("Pre-fetching earnings dates from Interactive Brokers...")
-        for ticker in tickers:
-            scanner.earnings_checker.get_earnings_date(ticker)
-        print()
+    # Pre-fetch earnings dates for all tickers as one concurrent batch while we
+    # connect. check_batch runs its own event loop, so it gets a worker thread
+    # rather than the thread that owns the IB connection.
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        prefetch = None
+        if scanner.earnings_checker:
+            print("Pre-fetching earnings dates...")
+            prefetch = executor.submit(scanner.earnings_checker.check_batch, tickers)
+        
+        if not scanner.connect():
+            print("Could not connect to Interactive Brokers")
+            print("Make sure TWS or IB Gateway is running (see IB_PORT)")
+            return None
+        
+        # Qualify every stock contract in one request while earnings finish loading
+        scanner.prefetch_contracts(tickers)
+        
+        if prefetch is not None:
+            try:
+                prefetch.result()
+            except Exception as e:
+                print(f"Warning: earnings pre-fetch failed: {e}")
+            print()
     
     all_opportunities = []
     scan_log = []
     
     try:
+        # IB pacing: only sleep for whatever part of MIN_TICKER_INTERVAL the
+        # previous ticker's scan didn't already use up
+        next_start = 0.0
+        
         for i, ticker in enumerate(tickers, 1):
-            start_time = time.time()
+            time.sleep(max(0.0, next_start - time.monotonic()))
+            next_start = time.monotonic() + MIN_TICKER_INTERVAL
+            
             log_entry = f"[{i}/{len(tickers)}] {ticker}..."
             print(log_entry)
             scan_log.append(log_entry)
             
-            try:
-                opportunities = scanner.scan_ticker(ticker, threshold=threshold)
-                
-                elapsed = time.time() - start_time
-                if opportunities:
-                    all_opportunities.extend(opportunities)
-                    msg = f"  Found {len(opportunities)} opportunity(ies) ({elapsed:.1f}s)"
-                    print(msg)
-                    scan_log.append(msg)
-                else:
-                    msg = f"  No opportunities ({elapsed:.1f}s)"
-                    print(msg)
-                    scan_log.append(msg)
-                
-                if i < len(tickers):
-                    time.sleep(1)
-                    
-            except Exception as e:
-                msg = f"  Error: {e}"
-                print(msg)
-                scan_log.append(msg)
-                continue
+            opportunities, msg = _scan_one(scanner, ticker, threshold)
+            all_opportunities.extend(opportunities)
+            print(msg)
+            scan_log.append(msg)
         
         print()
         print("=" * 80)
@@ -223,75 +324,19 @@ def run_mag7_scan(threshold=0.2):
             df['best_ff'] = df[['ff_avg', 'ff_call', 'ff_put']].max(axis=1)
             df = df.sort_values('best_ff', ascending=False)
             
-            results = []
-            for _, row in df.iterrows():
-                trade_details = calculate_trade_details(row)
-                
-                result = {
-                    'ticker': row['ticker'],
-                    'price': float(row['price']),
-                    'ma_200': float(row['ma_200']) if pd.notna(row.get('ma_200')) else None,
-                    'above_ma_200': bool(row['above_ma_200']) if pd.notna(row.get('above_ma_200')) else None,
-                    'expiry1': str(row['expiry1']),
-                    'expiry2': str(row['expiry2']),
-                    'dte1': int(row['dte1']),
-                    'dte2': int(row['dte2']),
-                    'ff_call': float(row['ff_call']) if pd.notna(row['ff_call']) else None,
-                    'ff_put': float(row['ff_put']) if pd.notna(row['ff_put']) else None,
-                    'ff_avg': float(row['ff_avg']) if pd.notna(row['ff_avg']) else None,
-                    'best_ff': float(row['best_ff']),
-                    'next_earnings': row.get('next_earnings', None),
-                    'call_iv1': float(row['call_iv1']) if pd.notna(row['call_iv1']) else None,
-                    'call_iv2': float(row['call_iv2']) if pd.notna(row['call_iv2']) else None,
-                    'put_iv1': float(row['put_iv1']) if pd.notna(row['put_iv1']) else None,
-                    'put_iv2': float(row['put_iv2']) if pd.notna(row['put_iv2']) else None,
-                    'avg_iv1': float(row['avg_iv1']) if pd.notna(row['avg_iv1']) else None,
-                    'avg_iv2': float(row['avg_iv2']) if pd.notna(row['avg_iv2']) else None,
-                    'fwd_var_call': float(row['fwd_var_call']) if pd.notna(row.get('fwd_var_call')) else None,
-                    'fwd_var_put': float(row['fwd_var_put']) if pd.notna(row.get('fwd_var_put')) else None,
-                    'fwd_var_avg': float(row['fwd_var_avg']) if pd.notna(row.get('fwd_var_avg')) else None,
-                    'fwd_vol_call': float(row['fwd_vol_call']) if pd.notna(row.get('fwd_vol_call')) else None,
-                    'fwd_vol_put': float(row['fwd_vol_put']) if pd.notna(row.get('fwd_vol_put')) else None,
-                    'fwd_vol_avg': float(row['fwd_vol_avg']) if pd.notna(row.get('fwd_vol_avg')) else None,
-                    'trade': trade_details
-                }
-                results.append(result)
-            
-            # Print detailed recommendations
-            print()
-            print("=" * 80)
-            print(f"TOP {min(3, len(results))} TRADE RECOMMENDATIONS")
-            print("=" * 80)
-            print()
+            results = _opportunity_records(df, calculate_trade_details(df))
             
+            # Print detailed recommendations (built up and written in one go)
+            lines = [
+                "",
+                "=" * 80,
+                f"TOP {min(3, len(results))} TRADE RECOMMENDATIONS",
+                "=" * 80,
+                "",
+            ]
             for i, result in enumerate(results[:3], 1):
-                trade = result['trade']
-                print(f"#{i} - {result['ticker']} @ ${result['price']:.2f}")
-                print("-" * 80)
-                print(f"  Expiry Window: {result['expiry1']} ({result['dte1']}d) → {result['expiry2']} ({result['dte2']}d)")
-                print()
-                print(f"  RECOMMENDED: {trade['spread_type']} CALENDAR SPREAD")
-                print(f"     Forward Factor: {trade['ff_display']:.3f} ({trade['ff_display']*100:.1f}%)")
-                print(f"     Front IV: {trade['front_iv']:.2f}% | Back IV: {trade['back_iv']:.2f}%")
-                print()
-                print(f"  ESTIMATED PRICING (per contract):")
-                print(f"     Front {trade['spread_type']}: ~${trade['front_price']:.2f} (${trade['front_price']*100:.0f})")
-                print(f"     Back {trade['spread_type']}:  ~${trade['back_price']:.2f} (${trade['back_price']*100:.0f})")
-                print(f"     Net Debit:      ~${trade['net_debit']:.2f} (${trade['net_debit_total']:.0f})")
-                print()
-                print(f"  POTENTIAL OUTCOMES (1 contract):")
-                print(f"     Best Case:   +${trade['best_case']:.0f} ({trade['best_case_pct']:.0f}%)")
-                print(f"     Typical:     +${trade['typical_case']:.0f} ({trade['typical_case_pct']:.0f}%)")
-                print(f"     Adverse:     ${trade['adverse_case']:.0f} ({trade['adverse_case_pct']:.0f}%)")
-                print(f"     Max Loss:    ${trade['max_loss']:.0f} ({trade['max_loss_pct']:.0f}%)")
-                print()
-                print(f"  Trade Setup:")
-                print(f"     • Sell: {result['expiry1']} ${trade['strike']:.0f} {trade['spread_type']}")
-                print(f"     • Buy:  {result['expiry2']} ${trade['strike']:.0f} {trade['spread_type']}")
-                print(f"     • Hold until: {result['expiry1']}")
-                print()
-                print("=" * 80)
-                print()
+                lines.extend(_recommendation_lines(i, result))
+            sys.stdout.write("\n".join(lines) + "\n")
             
             result_data = {
                 'timestamp': datetime.now().isoformat(),
@@ -314,10 +359,10 @@ def run_mag7_scan(threshold=0.2):
                     'date': datetime.now().strftime('%Y-%m-%d'),
                     'universe': 'MAG7',
                     'total_tickers': len(iv_rankings_data),
-                    'rankings': iv_rankings_data
+                    'rankings': [asdict(r) for r in iv_rankings_data]
                 }
-                with open(iv_rankings_file, 'w') as f:
-                    json.dump(iv_rankings_result, f, indent=2)
+                with open(iv_rankings_file, 'wb') as f:
+                    f.write(_encode_json(iv_rankings_result))
                 print(f"[OK] IV Rankings saved to {iv_rankings_file}")
             
             return result_data
@@ -343,10 +388,10 @@ def run_mag7_scan(threshold=0.2):
                     'date': datetime.now().strftime('%Y-%m-%d'),
                     'universe': 'MAG7',
                     'total_tickers': len(iv_rankings_data),
-                    'rankings': iv_rankings_data
+                    'rankings': [asdict(r) for r in iv_rankings_data]
                 }
-                with open(iv_rankings_file, 'w') as f:
-                    json.dump(iv_rankings_result, f, indent=2)
+                with open(iv_rankings_file, 'wb') as f:
+                    f.write(_encode_json(iv_rankings_result))
                 print(f"[OK] IV Rankings saved to {iv_rankings_file}")
             
             return result_data
@@ -359,16 +404,18 @@ if __name__ == "__main__":
     results = run_mag7_scan(threshold=0.2)
     
     if results:
+        # Encoded once, written to both files
+        payload = _encode_json(results)
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         filename = f"scan_results_{timestamp}.json"
         
-        with open(filename, 'w') as f:
-            json.dump(results, f, indent=2)
+        with open(filename, 'wb') as f:
+            f.write(payload)
         
         print(f"Results saved to: {filename}")
         
-        with open("scan_results_latest.json", 'w') as f:
-            json.dump(results, f, indent=2)
+        with open("scan_results_latest.json", 'wb') as f:
+            f.write(payload)
         
         print(f"Latest results saved to: scan_results_latest.json")
         
@@ -4,6 +4,8 @@ Requires: ib_insync library and IB Gateway/TWS running
 """
 
 import math
+from dataclasses import dataclass
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
@@ -116,7 +118,7 @@ def print_bordered_table(df):
 class IBScanner:
     """Interactive Brokers Forward Volatility Scanner."""
     
-    def __init__(self, host=None, port=None, client_id=None, check_earnings=True):
+    def __init__(self, host=None, port=None, client_id=None, check_earnings=True, pool=None):
         """
         Initialize IB connection.
         
@@ -125,6 +127,7 @@ class IBScanner:
             port: 7498 for TWS paper, 7496 for TWS live, 4002 for Gateway paper, 4001 for Gateway live
             client_id: Unique client ID
             check_earnings: Filter out tickers with earnings in trading window (default: True)
+            pool: Optional IBConnectionPool; its shared connection is used instead
         """
         if host is None:
             host = os.environ.get('IB_HOST', '127.0.0.1')
@@ -133,7 +136,8 @@ class IBScanner:
         if client_id is None:
             # Default to a higher clientId to reduce collisions with manual TWS/Gateway sessions.
             client_id = int(os.environ.get('IB_CLIENT_ID', '110'))
-        self.ib = IB()
+        self.pool = pool
+        self.ib = pool.get() if pool is not None else IB()
         self.host = host
         self.port = port
         self.client_id = client_id
@@ -144,6 +148,7 @@ class IBScanner:
         self.ma_200_cache = {}  # Cache for 200-day MA
         self._opt_params_cache = {}  # Cache for reqSecDefOptParams results per ticker
         self._opt_chain_choice_cache = {}  # Cache chosen option chain per ticker
+        self._stock_contract_cache = {}  # Cache qualified Stock contracts per ticker
 
         # Persistent exclude list for tickers IB can't qualify (e.g., delisted / no security definition).
         exclude_enabled = os.environ.get('EXCLUDE_TICKERS_ENABLED', '1').strip().lower() not in ('0', 'false', 'no', 'n')
@@ -173,8 +178,14 @@ class IBScanner:
                     print(f"  Retrying in {wait_time} seconds (attempt {attempt + 1}/{max_retries})...")
                     time.sleep(wait_time)
                 
-                print(f"Connecting to Interactive Brokers at {self.host}:{self.port}...")
-                self.ib.connect(self.host, self.port, clientId=self.client_id, timeout=10)
+                if self.pool is not None:
+                    # Reuses the shared connection when it is already up
+                    if not self.ib.isConnected():
+                        print(f"Connecting to Interactive Brokers at {self.pool.host}:{self.pool.port}...")
+                    self.pool.connect(timeout=10)
+                else:
+                    print(f"Connecting to Interactive Brokers at {self.host}:{self.port}...")
+                    self.ib.connect(self.host, self.port, clientId=self.client_id, timeout=10)
 
                 # Register error handler once so we can persistently exclude unqualifiable tickers.
                 if not self._error_handler_registered:
@@ -259,11 +270,48 @@ class IBScanner:
         return False
     
     def disconnect(self):
-        """Disconnect from IB."""
+        """Disconnect from IB (a pooled connection stays open for its other users)."""
         if self.connected:
-            self.ib.disconnect()
+            if self.pool is None:
+                self.ib.disconnect()
             self.connected = False
     
+    def _qualified_stock(self, ticker: str) -> 'Stock':
+        """Stock contract for ticker, qualified once and then served from cache.
+        
+        A contract that doesn't qualify (no conId) is returned but not cached.
+        """
+        stock = self._stock_contract_cache.get(ticker)
+        if stock is None:
+            stock = Stock(ticker, 'SMART', 'USD')
+            self.ib.qualifyContracts(stock)
+            if getattr(stock, 'conId', 0):
+                self._stock_contract_cache[ticker] = stock
+        return stock
+    
+    def prefetch_contracts(self, tickers: List[str]) -> int:
+        """Qualify the stock contracts for many tickers in one call.
+        
+        qualifyContracts sends all the contract-details requests at once, so this
+        costs about one round-trip; the per-ticker lookups in scan_ticker (price,
+        200MA, option params, ATM IV) then skip their own qualify.
+        
+        Returns:
+            Number of tickers with a cached contract
+        """
+        todo = [t for t in tickers
+                if t not in self._stock_contract_cache and not self.excluded_tickers.is_excluded(t)]
+        if todo:
+            contracts = [Stock(t, 'SMART', 'USD') for t in todo]
+            try:
+                self.ib.qualifyContracts(*contracts)
+            except Exception as e:
+                print(f"  [WARNING] Contract prefetch failed: {e}")
+            for ticker, contract in zip(todo, contracts):
+                if getattr(contract, 'conId', 0):
+                    self._stock_contract_cache[ticker] = contract
+        return sum(1 for t in tickers if t in self._stock_contract_cache)
+    
     def get_stock_price(self, ticker: str) -> Optional[float]:
         """Get current stock price."""
         if self.excluded_tickers.is_excluded(ticker):
@@ -276,9 +324,8 @@ class IBScanner:
         stock = None
         ticker_data = None
         try:
-            stock = Stock(ticker, 'SMART', 'USD')
             try:
-                self.ib.qualifyContracts(stock)
+                stock = self._qualified_stock(ticker)
             except Exception as e:
                 if self._should_exclude_on_exception(ticker, e):
                     self._exclude_ticker(ticker, reason=str(e), source='qualifyContracts:stock')
@@ -350,9 +397,8 @@ class IBScanner:
         try:
             if self.excluded_tickers.is_excluded(ticker):
                 return None
-            stock = Stock(ticker, 'SMART', 'USD')
             try:
-                self.ib.qualifyContracts(stock)
+                stock = self._qualified_stock(ticker)
             except Exception as e:
                 if self._should_exclude_on_exception(ticker, e):
                     self._exclude_ticker(ticker, reason=str(e), source='qualifyContracts:ma200')
@@ -445,9 +491,8 @@ class IBScanner:
                 self._opt_params_cache[ticker] = []
                 return []
 
-            stock = Stock(ticker, 'SMART', 'USD')
             try:
-                self.ib.qualifyContracts(stock)
+                stock = self._qualified_stock(ticker)
             except Exception as e:
                 if self._should_exclude_on_exception(ticker, e):
                     self._exclude_ticker(ticker, reason=str(e), source='qualifyContracts:optParams')
@@ -538,22 +583,7 @@ class IBScanner:
             Average IV as a percentage, or None if not available
         """
         try:
-            expirations = self.get_option_chains(ticker)
-            if not expirations:
-                return None
-            
-            # Find the nearest expiration in the 7-90 day range
-            # Prefer shorter DTEs but accept monthly expirations (30/60/90)
-            best_expiry = None
-            best_dte = None
-            
-            for exp in expirations:
-                dte = calculate_dte(exp)
-                if 7 <= dte <= 90:  # Accept 1 week to 3 months
-                    if best_expiry is None or dte < best_dte:
-                        best_expiry = exp
-                        best_dte = dte
-            
+            best_expiry = self._near_term_expiry(ticker)
             if not best_expiry:
                 return None
             
@@ -567,6 +597,170 @@ class IBScanner:
         except Exception as e:
             return None
     
+    def _near_term_expiry(self, ticker: str) -> Optional[str]:
+        """Nearest expiration in the 7-90 day range, or None."""
+        expirations = self.get_option_chains(ticker)
+        if not expirations:
+            return None
+        
+        # Find the nearest expiration in the 7-90 day range
+        # Prefer shorter DTEs but accept monthly expirations (30/60/90)
+        best_expiry = None
+        best_dte = None
+        
+        for exp in expirations:
+            dte = calculate_dte(exp)
+            if 7 <= dte <= 90:  # Accept 1 week to 3 months
+                if best_expiry is None or dte < best_dte:
+                    best_expiry = exp
+                    best_dte = dte
+        
+        return best_expiry
+    
+    def get_stock_prices(self, tickers: List[str]) -> Dict[str, float]:
+        """Get current prices for many tickers with one qualify + one snapshot call.
+        
+        Tickers the batch can't price go through get_stock_price (which also
+        handles error-200 exclusions).
+        """
+        prices = {}
+        todo = []
+        for ticker in tickers:
+            if self.excluded_tickers.is_excluded(ticker):
+                continue
+            if ticker in self.price_cache:
+                prices[ticker] = self.price_cache[ticker]
+            else:
+                todo.append(ticker)
+        
+        if todo:
+            self.prefetch_contracts(todo)
+            qualified = [self._stock_contract_cache[t] for t in todo if t in self._stock_contract_cache]
+            try:
+                snaps = self.ib.reqTickers(*qualified) if qualified else []
+            except Exception:
+                snaps = []
+            
+            for t in snaps:
+                symbol = getattr(t.contract, 'symbol', None)
+                price = t.marketPrice()
+                if not (price and price > 0):
+                    price = t.last if getattr(t, 'last', None) and t.last > 0 else None
+                if symbol and price:
+                    self.price_cache[symbol] = price
+                    prices[symbol] = price
+            
+            for ticker in todo:
+                if ticker not in prices:
+                    price = self.get_stock_price(ticker)
+                    if price:
+                        prices[ticker] = price
+        
+        return prices
+    
+    def get_near_term_ivs(self, prices: Dict[str, float]) -> Dict[str, float]:
+        """Get near-term IV for many tickers with a single market-data wait.
+        
+        Same expiry/strike choice as get_near_term_iv, but the ATM call/put for
+        every ticker is qualified in one call and subscribed together, so the
+        IV wait is paid once per batch instead of once per ticker. Tickers
+        whose nearest strike doesn't qualify fall back to get_near_term_iv.
+        
+        Args:
+            prices: Dict of ticker -> current stock price
+        
+        Returns:
+            Dict of ticker -> average ATM IV as a percentage
+        """
+        legs = {}
+        for ticker, price in prices.items():
+            try:
+                expiry = self._near_term_expiry(ticker)
+                if not expiry:
+                    continue
+                chain = self._select_option_chain(ticker)
+                candidates = self._candidate_strikes(getattr(chain, 'strikes', []), price)
+                if not candidates:
+                    continue
+                legs[ticker] = (
+                    self._make_option(ticker, expiry, candidates[0], 'C', chain),
+                    self._make_option(ticker, expiry, candidates[0], 'P', chain),
+                )
+            except Exception:
+                continue
+        
+        if legs:
+            try:
+                self.ib.qualifyContracts(*[o for pair in legs.values() for o in pair])
+            except Exception:
+                pass
+        
+        fallback = [t for t, (call, put) in legs.items()
+                    if not getattr(call, 'conId', 0) or not getattr(put, 'conId', 0)]
+        for ticker in fallback:
+            del legs[ticker]
+        
+        def _has_iv(t):
+            return bool(t.modelGreeks and t.modelGreeks.impliedVol)
+        
+        ivs = {}
+        subscribed = []
+        try:
+            data = {}
+            for ticker, (call, put) in legs.items():
+                call_ticker = self.ib.reqMktData(call, '106', False, False)  # 106 = option IV
+                subscribed.append(call)
+                put_ticker = self.ib.reqMktData(put, '106', False, False)
+                subscribed.append(put)
+                data[ticker] = (call_ticker, put_ticker)
+            
+            if data:
+                print(f"    Waiting for IV data ({len(data)} tickers)...", flush=True)
+                try:
+                    iv_wait_s = float(os.environ.get('IB_OPTION_IV_SLEEP_SECONDS', '2'))
+                except Exception:
+                    iv_wait_s = 2.0
+                
+                # Stop waiting as soon as every leg has model greeks
+                deadline = time.time() + iv_wait_s
+                while time.time() < deadline:
+                    if all(_has_iv(c) and _has_iv(p) for c, p in data.values()):
+                        break
+                    self.ib.waitOnUpdate(timeout=max(0.0, deadline - time.time()))
+            
+            for ticker, (call_ticker, put_ticker) in data.items():
+                call, put = legs[ticker]
+                leg_ivs = []
+                for contract, tkr in ((call, call_ticker), (put, put_ticker)):
+                    iv = None
+                    if _has_iv(tkr):
+                        iv = tkr.modelGreeks.impliedVol * 100
+                    elif tkr.last and tkr.last > 0:
+                        # Less liquid names may have a last price but no modelGreeks
+                        try:
+                            calc_iv = self.ib.calculateImpliedVolatility(contract, tkr.last, prices[ticker])
+                            if calc_iv and getattr(calc_iv, 'impliedVolatility', None):
+                                iv = calc_iv.impliedVolatility * 100
+                        except Exception:
+                            pass
+                    if iv and iv > 0:
+                        leg_ivs.append(iv)
+                if leg_ivs:
+                    ivs[ticker] = sum(leg_ivs) / len(leg_ivs)
+        finally:
+            for contract in subscribed:
+                try:
+                    self.ib.cancelMktData(contract)
+                except Exception:
+                    pass
+        
+        for ticker in fallback:
+            iv = self.get_near_term_iv(ticker, prices[ticker])
+            if iv:
+                ivs[ticker] = iv
+        
+        return ivs
+    
     def get_atm_iv(self, ticker: str, expiry: str, current_price: float, debug: bool = False) -> Optional[Dict]:
         """Get ATM implied volatility for specific expiry.
         
@@ -576,8 +770,7 @@ class IBScanner:
         call = None
         put = None
         try:
-            stock = Stock(ticker, 'SMART', 'USD')
-            self.ib.qualifyContracts(stock)
+            self._qualified_stock(ticker)
             
             chain = self._select_option_chain(ticker)
             if not chain:
@@ -757,8 +950,7 @@ class IBScanner:
         call2 = None
         put2 = None
         try:
-            stock = Stock(ticker, 'SMART', 'USD')
-            self.ib.qualifyContracts(stock)
+            self._qualified_stock(ticker)
             
             chain = self._select_option_chain(ticker)
             if not chain:
@@ -1037,7 +1229,7 @@ class IBScanner:
                 # Get earnings date if available
                 next_earnings = None
                 if self.check_earnings and self.earnings_checker:
-                    earnings_date = self.earnings_checker.cache.get(ticker)
+                    earnings_date = self.earnings_checker.get_cached_date(ticker)
                     if not earnings_date:
                         # Fetch it from cached earnings sources (Finnhub primary; Yahoo fallback/confirm)
                         # Use a long enough window to cover the back expiry (e.g. 30/90 pairs).
@@ -1117,9 +1309,45 @@ class IBScanner:
 # Reconnect to IB every N tickers to avoid memory buildup
 RECONNECT_INTERVAL = 100
 
+# Tickers whose option IV is requested together in rank_tickers_by_iv.
+# Each ticker holds two market data lines (ATM call + put) during its wave.
+IV_RANK_WAVE_SIZE = int(os.environ.get('IV_RANK_WAVE_SIZE', '40'))
+
+
+@dataclass(frozen=True)
+class IVResult:
+    """One row of an IV rankings file (see dataclasses.asdict for the JSON form)."""
+    ticker: str
+    price: Optional[float]
+    iv: Optional[float]
+    ma_200: Optional[float] = None
+    above_ma_200: Optional[bool] = None
+    universe: Optional[str] = None
+    next_earnings: Optional[str] = None
+
+
+def _sort_by_iv_desc(rows: List[tuple], top_n: Optional[int] = None) -> List[tuple]:
+    """Order (ticker, iv, price) rows by IV descending; ties keep scan order.
+    
+    With top_n, only the rows that can make the cut are sorted (argpartition
+    selects them in linear time).
+    """
+    if not rows:
+        return rows
+    neg_iv = -np.fromiter((r[1] for r in rows), dtype=np.float64, count=len(rows))
+    if top_n and top_n < len(neg_iv) and not np.isnan(neg_iv).any():
+        cutoff = neg_iv[np.argpartition(neg_iv, top_n - 1)[top_n - 1]]
+        # Keep every row tied with the cutoff so the stable sort breaks ties as before
+        candidates = np.flatnonzero(neg_iv <= cutoff)
+        order = candidates[np.argsort(neg_iv[candidates], kind='stable')][:top_n]
+    else:
+        order = np.argsort(neg_iv, kind='stable')[:top_n or None]
+    return [rows[i] for i in order]
+
 
 def rank_tickers_by_iv(scanner: IBScanner, tickers: List[str], top_n: Optional[int] = None, 
-                       reconnect_interval: int = RECONNECT_INTERVAL) -> List[tuple]:
+                       reconnect_interval: int = RECONNECT_INTERVAL,
+                       wave_size: int = IV_RANK_WAVE_SIZE) -> List[tuple]:
     """
     Rank tickers by near-term IV to prioritize high IV stocks.
     
@@ -1128,6 +1356,7 @@ def rank_tickers_by_iv(scanner: IBScanner, tickers: List[str], top_n: Optional[i
         tickers: List of ticker symbols
         top_n: Return only top N tickers (None = return all)
         reconnect_interval: Reconnect to IB every N tickers to avoid memory buildup
+        wave_size: Tickers scanned concurrently (two option data lines each)
     
     Returns:
         List of (ticker, iv, price) tuples sorted by IV descending
@@ -1141,60 +1370,70 @@ def rank_tickers_by_iv(scanner: IBScanner, tickers: List[str], top_n: Optional[i
     tickers_since_reconnect = 0
     total = len(tickers)
     
+    pending = []
     for i, ticker in enumerate(tickers, 1):
         if scanner.excluded_tickers.is_excluded(ticker):
             print(f"[{i}/{total}] Checking {ticker}... [SKIP] Excluded")
             continue
+        pending.append((i, ticker))
+    
+    # Tickers are scanned in waves: one price snapshot and one IV wait per wave
+    # instead of per ticker. Each wave holds two option lines per ticker.
+    for start in range(0, len(pending), wave_size):
+        wave = pending[start:start + wave_size]
+        
         # Periodic reconnection to avoid memory buildup
-        tickers_since_reconnect += 1
+        tickers_since_reconnect += len(wave)
         if tickers_since_reconnect >= reconnect_interval:
-            print(f"\n[INFO] Reconnecting to IB to free memory ({i}/{total})...")
+            print(f"\n[INFO] Reconnecting to IB to free memory ({wave[0][0]}/{total})...")
             try:
                 scanner.disconnect()
                 time.sleep(2)  # Wait for clean disconnect
                 if not scanner.connect():
                     print("[ERROR] Failed to reconnect to IB")
                     break
-                tickers_since_reconnect = 0
+                tickers_since_reconnect = len(wave)
                 print(f"[OK] Reconnected successfully\n")
             except Exception as e:
                 print(f"[ERROR] Reconnection failed: {e}")
                 break
         
-        print(f"[{i}/{total}] Checking {ticker}...", end=" ")
+        print(f"[{wave[0][0]}-{wave[-1][0]}/{total}] Checking {len(wave)} tickers...")
         
         try:
-            price = scanner.get_stock_price(ticker)
+            prices = scanner.get_stock_prices([t for _, t in wave])
+            ivs = scanner.get_near_term_ivs(prices)
+        except Exception as e:
+            print(f"[ERROR] Error: {e}")
+            continue
+        
+        for i, ticker in wave:
+            price = prices.get(ticker)
             if not price:
-                print("[ERROR] No price data")
+                print(f"[{i}/{total}] {ticker}: [ERROR] No price data")
                 continue
-            
-            iv = scanner.get_near_term_iv(ticker, price)
+            iv = ivs.get(ticker)
             if iv:
                 ticker_ivs.append((ticker, iv, price))
-                print(f"[OK] IV: {iv:.1f}%")
+                print(f"[{i}/{total}] {ticker}: [OK] IV: {iv:.1f}%")
             else:
-                print("[WARNING] No IV data")
-            
-            time.sleep(0.05)  # Reduced rate limiting for faster scans
-            
-        except Exception as e:
-            print(f"[ERROR] Error: {e}")
+                print(f"[{i}/{total}] {ticker}: [WARNING] No IV data")
     
-    # Sort by IV descending
-    ticker_ivs.sort(key=lambda x: x[1], reverse=True)
+    # Sort by IV descending (only the top_n rows when a limit is given)
+    ranked_count = len(ticker_ivs)
+    ticker_ivs = _sort_by_iv_desc(ticker_ivs, top_n)
     
     print("\n" + "=" * 80)
     print("IV RANKING RESULTS")
     print("=" * 80)
     
-    for i, (ticker, iv, price) in enumerate(ticker_ivs[:top_n] if top_n else ticker_ivs, 1):
+    for i, (ticker, iv, price) in enumerate(ticker_ivs, 1):
         print(f"{i:2d}. {ticker:6s} - IV: {iv:5.1f}% (Price: ${price:.2f})")
     
-    if top_n and len(ticker_ivs) > top_n:
-        print(f"\n(Showing top {top_n} of {len(ticker_ivs)} tickers)")
+    if top_n and ranked_count > top_n:
+        print(f"\n(Showing top {top_n} of {ranked_count} tickers)")
     
-    return ticker_ivs[:top_n] if top_n else ticker_ivs
+    return ticker_ivs
 
 
 def rank_tickers_by_underlying_iv(
@@ -1338,11 +1577,7 @@ def rank_tickers_by_underlying_iv(
                 _process_single(sym)
             continue
 
-    results.sort(key=lambda x: x[1], reverse=True)
-
-    if top_n:
-        return results[:top_n]
-    return results
+    return _sort_by_iv_desc(results, top_n)
 
 
 def scan_batch(scanner: IBScanner, tickers: List[str], threshold: float = 0.2, 
@@ -1371,6 +1606,7 @@ def scan_batch(scanner: IBScanner, tickers: List[str], threshold: float = 0.2,
     print("=" * 80)
     
     all_opportunities = []
+    scanner.prefetch_contracts(scan_list)
     
     for i, ticker in enumerate(scan_list, 1):
         if scanner.excluded_tickers.is_excluded(ticker):
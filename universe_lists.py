@@ -0,0 +1,6 @@
+"""
+Ticker universes shared by more than one index module
+"""
+
+# "Magnificent 7" mega-cap tech stocks
+MAG7 = ('AAPL', 'MSFT', 'GOOGL', 'AMZN', 'NVDA', 'META', 'TSLA')